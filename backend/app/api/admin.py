@@ -0,0 +1,136 @@
+import json
+import asyncio
+import secrets
+from fastapi import APIRouter, HTTPException, Depends, Header, Body, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional, Dict
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.services.nlp_service import nlp_service
+from app.services.taxonomy_store import taxonomy_store
+from app.services import tracing
+from app.services.metrics import run_in_executor
+from app.services.profiler import profiler
+
+
+router = APIRouter()
+
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Dependency that only allows requests carrying the configured admin key"""
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled"
+        )
+    
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key"
+        )
+
+
+@router.get("/taxonomy", dependencies=[Depends(require_admin)])
+async def get_taxonomy():
+    """Get the loaded skill taxonomy version"""
+    return {"revision": taxonomy_store.revision, **nlp_service.taxonomy.summary()}
+
+
+def _read_taxonomy_file() -> Dict:
+    with open(settings.skill_taxonomy_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@router.post("/taxonomy/reload", dependencies=[Depends(require_admin)])
+async def reload_taxonomy(taxonomy: Optional[Dict] = Body(None)):
+    """
+    Publish a new skill taxonomy without restarting.
+    Loads the posted taxonomy document, or re-reads the configured taxonomy file,
+    and saves it as the next revision. This worker swaps it in right away;
+    the others pick it up within TAXONOMY_POLL_INTERVAL seconds.
+    """
+    try:
+        if taxonomy is None:
+            taxonomy = await run_in_executor("taxonomy", _read_taxonomy_file)
+        # Build (including the embedding index) off the event loop, then swap atomically
+        new_taxonomy = await run_in_executor("taxonomy", nlp_service.build_taxonomy, taxonomy)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid taxonomy: {str(e)}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error loading taxonomy: {str(e)}"
+        )
+    
+    previous_version = nlp_service.taxonomy.version
+    try:
+        revision = await taxonomy_store.publish(taxonomy, new_taxonomy)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Another taxonomy reload is in progress, try again")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error saving taxonomy: {str(e)}"
+        )
+    return {
+        "previous_version": previous_version,
+        "revision": revision,
+        **new_taxonomy.summary()
+    }
+
+
+@router.get("/traces", dependencies=[Depends(require_admin)])
+async def get_traces(limit: int = 20):
+    """Get the most recent request traces with their stage spans"""
+    return {"traces": tracing.recent_traces(min(max(limit, 1), tracing.RECENT_TRACES))}
+
+
+@router.post("/profile", dependencies=[Depends(require_admin)])
+async def profile(
+    seconds: float = 10.0,
+    interval_ms: float = 10.0,
+    requests: Optional[int] = None,
+    output_format: str = Query("collapsed", alias="format")
+):
+    """
+    Capture a sampling profile of this worker.
+    Samples for `seconds`, or until the next `requests` analysis requests finish
+    (with `seconds` as the timeout). Returns collapsed stacks rooted at a
+    stage:<name> frame for flamegraph tools, or a JSON summary with format=json.
+    """
+    if not settings.profiler_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profiler is disabled"
+        )
+    if output_format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'json'")
+    if requests is not None and requests < 1:
+        raise HTTPException(status_code=400, detail="requests must be at least 1")
+    
+    seconds = min(max(seconds, 0.1), settings.profiler_max_seconds)
+    interval = max(interval_ms, 1.0) / 1000
+    
+    try:
+        session = profiler.start(interval, request_limit=requests)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    try:
+        if requests:
+            try:
+                await asyncio.wait_for(session.done.wait(), timeout=seconds)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    
+    if output_format == "json":
+        return {**session.summary(), "folded": session.folded()}
+    return PlainTextResponse(
+        session.folded(),
+        headers={"X-Profile-Samples": str(session.samples)}
+    )
@@ -1,24 +1,50 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
 from fastapi.responses import StreamingResponse
-from typing import Optional
+from typing import Optional, Tuple
+from collections import OrderedDict
 from datetime import datetime
-import json
+from pymongo import DESCENDING
+from beanie import PydanticObjectId
+import base64
+import time
 import asyncio
 
-from app.models import AnalysisRequest, AnalysisResult, UserAnalysis
+from app.config import settings
+from app.models import AnalysisRequest, AnalysisResult, UserAnalysis, AnalysisSummary, RoadmapRequest, User
+from app.api.auth import get_current_user, get_optional_user
+from app.database import read_collection
+from app.services.metrics import record_cache
 from app.services.file_service import file_service
 from app.services.analysis_service import analysis_service
 from app.services.llm_service import llm_service
+from app.services.document_store import document_store
+from app.services.analysis_writer import analysis_writer
+from app.services.tracing import span, traced_stream
+from app.serialization import FastJSONResponse, sse_event, make_etag, etag_matches, not_modified, cache_headers
 
 
 router = APIRouter()
 
+# Progress events are the same for every request, so they are encoded once
+_NO_RESUME = sse_event({'error': 'Either resume_text or resume_file must be provided'})
+_STARTING = sse_event({'progress': 5, 'message': 'Starting analysis...'})
+_PROCESSING_FILE = sse_event({'progress': 10, 'message': 'Processing uploaded file...'})
+_FILE_PROCESSED = sse_event({'progress': 20, 'message': 'File processed successfully'})
+_TEXT_RECEIVED = sse_event({'progress': 20, 'message': 'Resume text received'})
+_RESUME_TOO_SHORT = sse_event({'error': 'Resume text is too short or empty'})
+_EXTRACTING = sse_event({'progress': 30, 'message': 'Extracting skills from resume...'})
+_ANALYZING_JOB = sse_event({'progress': 45, 'message': 'Analyzing job requirements...'})
+_MATCHING = sse_event({'progress': 65, 'message': 'Calculating skill match...'})
+_GENERATING_SUGGESTIONS = sse_event({'progress': 75, 'message': 'Generating AI recommendations...'})
+_SAVING = sse_event({'progress': 90, 'message': 'Saving results...'})
+
 
 @router.post("/analyze")
 async def analyze_resume(
     job_description: str = Form(...),
     resume_text: Optional[str] = Form(None),
-    resume_file: Optional[UploadFile] = File(None)
+    resume_file: Optional[UploadFile] = File(None),
+    current_user: Optional[User] = Depends(get_optional_user)
 ):
     """
     Analyze resume against job description with real-time progress updates
@@ -28,10 +54,10 @@ async def analyze_resume(
         try:
             # Validate input
             if not resume_text and not resume_file:
-                yield f"data: {json.dumps({'error': 'Either resume_text or resume_file must be provided'})}\n\n"
+                yield _NO_RESUME
                 return
             
-            yield f"data: {json.dumps({'progress': 5, 'message': 'Starting analysis...'})}\n\n"
+            yield _STARTING
             await asyncio.sleep(0.1)
             
             # Extract resume text
@@ -39,81 +65,273 @@ async def analyze_resume(
             file_path = None
             
             if resume_file:
-                yield f"data: {json.dumps({'progress': 10, 'message': 'Processing uploaded file...'})}\n\n"
+                yield _PROCESSING_FILE
                 try:
                     file_path = await file_service.save_upload_file(resume_file)
                     final_resume_text = await file_service.extract_text_from_file(file_path)
-                    yield f"data: {json.dumps({'progress': 20, 'message': 'File processed successfully'})}\n\n"
+                    yield _FILE_PROCESSED
                 except Exception as e:
-                    yield f"data: {json.dumps({'error': f'Error processing file: {str(e)}'})}\n\n"
+                    yield sse_event({'error': f'Error processing file: {str(e)}'})
                     return
                 finally:
                     if file_path:
                         await file_service.cleanup_file(file_path)
             else:
-                yield f"data: {json.dumps({'progress': 20, 'message': 'Resume text received'})}\n\n"
+                yield _TEXT_RECEIVED
             
             if not final_resume_text or len(final_resume_text.strip()) < 50:
-                yield f"data: {json.dumps({'error': 'Resume text is too short or empty'})}\n\n"
+                yield _RESUME_TOO_SHORT
                 return
             
             # Perform analysis with progress updates
-            yield f"data: {json.dumps({'progress': 30, 'message': 'Extracting skills from resume...'})}\n\n"
+            yield _EXTRACTING
             await asyncio.sleep(0.1)
             
-            yield f"data: {json.dumps({'progress': 45, 'message': 'Analyzing job requirements...'})}\n\n"
-            result = await analysis_service.analyze(final_resume_text, job_description)
+            yield _ANALYZING_JOB
+            with span("analysis.analyze"):
+                result, _ = await analysis_service.run_analysis(final_resume_text, job_description)
             
-            yield f"data: {json.dumps({'progress': 65, 'message': 'Calculating skill match...'})}\n\n"
+            yield _MATCHING
             await asyncio.sleep(0.1)
             
             # Generate AI suggestions (only for top 3 missing skills for speed)
             missing_skill_names = [skill.skill for skill in result.missing_skills[:3]]
             if missing_skill_names:
-                yield f"data: {json.dumps({'progress': 75, 'message': 'Generating AI recommendations...'})}\n\n"
+                yield _GENERATING_SUGGESTIONS
                 try:
-                    resume_suggestions = await llm_service.generate_resume_rewrite_suggestions(
-                        final_resume_text[:1500],  # Limit text length for faster processing
-                        job_description[:1500],
-                        missing_skill_names
-                    )
+                    with span("analysis.llm_suggestions"):
+                        resume_suggestions = await llm_service.generate_resume_rewrite_suggestions(
+                            missing_skill_names
+                        )
                     result.resume_rewrite_suggestions = resume_suggestions
                 except Exception as llm_error:
                     print(f"LLM suggestion error: {llm_error}")
                     result.resume_rewrite_suggestions = "AI suggestions temporarily unavailable"
             
-            yield f"data: {json.dumps({'progress': 90, 'message': 'Saving results...'})}\n\n"
+            yield _SAVING
             
-            # Save to database (non-blocking)
+            # Queue for the write-behind buffer; the insert happens off the request path
             try:
-                user_analysis = UserAnalysis(
-                    resume_text=final_resume_text,
-                    job_description=job_description,
-                    analysis_result=result.dict(),
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                await user_analysis.insert()
+                with span("analysis.save"):
+                    user_analysis = _analysis_record(
+                        _history_owner(current_user),
+                        final_resume_text,
+                        job_description,
+                        result
+                    )
+                    await analysis_writer.enqueue(user_analysis)
             except Exception as db_error:
                 print(f"DB save error: {db_error}")
             
             # Send final result
-            yield f"data: {json.dumps({'progress': 100, 'message': 'Analysis complete!', 'result': result.dict()})}\n\n"
+            yield sse_event({'progress': 100, 'message': 'Analysis complete!'}, result=result)
             
         except Exception as e:
             print(f"Analysis error: {e}")
-            yield f"data: {json.dumps({'error': f'Analysis failed: {str(e)}'})}\n\n"
+            yield sse_event({'error': f'Analysis failed: {str(e)}'})
+    
+    # The stream outlives this handler, so carry the request trace into it
+    return StreamingResponse(
+        traced_stream(generate_progress(), "analysis.stream"),
+        media_type="text/event-stream"
+    )
+
+
+@router.post("/reanalyze")
+async def reanalyze_resume(
+    previous_analysis_id: str = Form(...),
+    resume_text: str = Form(...),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Re-run one of your previous analyses against an edited resume.
+    Reuses the cached job description and unchanged resume chunks.
+    """
+    if len(resume_text.strip()) < 50:
+        raise HTTPException(status_code=400, detail="Resume text is too short or empty")
+    
+    try:
+        previous = await analysis_writer.load(PydanticObjectId(previous_analysis_id))
+    except Exception:
+        previous = None
+    # Someone else's analysis is reported as missing rather than forbidden
+    owner = _history_owner(current_user)
+    if not previous or previous.user_id != owner:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    try:
+        previous_resume_text, job_description = await document_store.texts_for(previous)
+        if job_description is None:
+            raise HTTPException(status_code=404, detail="Job description for this analysis not found")
+        
+        with span("analysis.analyze"):
+            result, stats = await analysis_service.run_analysis(
+                resume_text,
+                job_description,
+                previous_resume_text=previous_resume_text
+            )
+        
+        # Reuse the previous AI suggestions when the top missing skills are unchanged
+        missing_skill_names = [skill.skill for skill in result.missing_skills[:3]]
+        previous_missing = [
+            skill.get('skill') for skill in previous.analysis_result.get('missing_skills', [])[:3]
+        ]
+        if missing_skill_names == previous_missing:
+            result.resume_rewrite_suggestions = previous.analysis_result.get('resume_rewrite_suggestions')
+        elif missing_skill_names:
+            result.resume_rewrite_suggestions = await llm_service.generate_resume_rewrite_suggestions(
+                missing_skill_names
+            )
+        
+        user_analysis = None
+        try:
+            user_analysis = _analysis_record(owner, resume_text, job_description, result)
+            await analysis_writer.enqueue(user_analysis)
+        except Exception as db_error:
+            print(f"DB save error: {db_error}")
+        
+        return FastJSONResponse({
+            "id": str(user_analysis.id) if user_analysis and user_analysis.id else None,
+            "previous_analysis_id": previous_analysis_id,
+            "chunks": stats,
+            "result": result.model_dump()
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Re-analysis failed: {str(e)}"
+        )
+
+
+@router.post("/roadmap")
+async def generate_roadmaps(request: RoadmapRequest):
+    """Generate learning roadmaps for one or more skills"""
+    skills = [skill.strip() for skill in request.skills if skill.strip()]
+    if not skills:
+        raise HTTPException(status_code=400, detail="At least one skill is required")
+    if len(set(skill.lower() for skill in skills)) > settings.roadmap_max_skills:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.roadmap_max_skills} skills per request"
+        )
+    
+    try:
+        roadmaps = await llm_service.generate_learning_roadmaps(
+            skills,
+            request.current_level,
+            request.target_level,
+            request.timeframe
+        )
+        return {"roadmaps": list(roadmaps.values())}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating roadmaps: {str(e)}"
+        )
+
+
+def _analysis_record(
+    user_id: Optional[str],
+    resume_text: str,
+    job_description: str,
+    result: AnalysisResult
+) -> UserAnalysis:
+    """Build an analysis referencing its texts by content hash
     
-    return StreamingResponse(generate_progress(), media_type="text/event-stream")
+    The texts are only staged here; the analysis writer stores them with
+    its next flush, before inserting the analysis.
+    """
+    now = datetime.utcnow()
+    return UserAnalysis(
+        user_id=user_id,
+        resume_hash=document_store.stage("resume", resume_text),
+        job_description_hash=document_store.stage("job_description", job_description),
+        analysis_result=analysis_service.compact_result(result),
+        created_at=now,
+        updated_at=now
+    )
+
+
+# Cached history counts per owner: owner -> (expires_at, total)
+_history_counts: "OrderedDict[Optional[str], Tuple[float, int]]" = OrderedDict()
+
+
+def _history_owner(user: Optional[User]) -> Optional[str]:
+    """Owner key stored on analyses (None for anonymous requests)"""
+    return str(user.id) if user else None
+
+
+def _encode_cursor(summary: AnalysisSummary) -> str:
+    """Opaque keyset cursor for the position after an analysis"""
+    raw = f"{summary.created_at.isoformat()}|{summary.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+    created_at, analysis_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), PydanticObjectId(analysis_id)
+
+
+async def _history_total(owner: Optional[str]) -> int:
+    """Number of analyses for an owner, cached briefly so paging doesn't recount"""
+    now = time.monotonic()
+    cached = _history_counts.get(owner)
+    record_cache("history_count", cached is not None and cached[0] > now)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    total = await read_collection(UserAnalysis).count_documents({"user_id": owner})
+    _history_counts[owner] = (now + settings.history_count_ttl, total)
+    _history_counts.move_to_end(owner)
+    while len(_history_counts) > 1024:
+        _history_counts.popitem(last=False)
+    return total
 
 
 @router.get("/history")
-async def get_analysis_history(limit: int = 10, skip: int = 0):
-    """Get analysis history"""
+async def get_analysis_history(
+    limit: int = 10,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """
+    Get analysis history, newest first.
+    Pass the returned next_cursor to fetch the following page; skip is only
+    honoured without a cursor and gets slower the deeper it goes.
+    """
+    limit = min(max(limit, 1), 100)
+    owner = _history_owner(current_user)
+    query = {"user_id": owner}
+    
+    if cursor:
+        try:
+            created_at, last_id = _decode_cursor(cursor)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Keyset condition matching the (user_id, created_at, _id) index order
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+    
     try:
-        analyses = await UserAnalysis.find_all().skip(skip).limit(limit).to_list()
-        return {
-            "total": await UserAnalysis.count(),
+        find = read_collection(UserAnalysis).find(query, AnalysisSummary.Settings.projection).sort(
+            [("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        if skip and not cursor:
+            find = find.skip(skip)
+        # One extra row tells us whether there is a next page
+        documents = await find.limit(limit + 1).to_list(length=limit + 1)
+        analyses = [AnalysisSummary(**document) for document in documents]
+        has_more = len(analyses) > limit
+        analyses = analyses[:limit]
+        
+        return FastJSONResponse({
+            "total": await _history_total(owner),
+            "next_cursor": _encode_cursor(analyses[-1]) if has_more else None,
             "analyses": [
                 {
                     "id": str(analysis.id),
@@ -123,7 +341,7 @@ async def get_analysis_history(limit: int = 10, skip: int = 0):
                 }
                 for analysis in analyses
             ]
-        }
+        })
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -132,14 +350,30 @@ async def get_analysis_history(limit: int = 10, skip: int = 0):
 
 
 @router.get("/history/{analysis_id}")
-async def get_analysis_by_id(analysis_id: str):
-    """Get specific analysis by ID"""
+async def get_analysis_by_id(analysis_id: str, request: Request):
+    """Get specific analysis by ID (supports If-None-Match)"""
     try:
-        from beanie import PydanticObjectId
-        analysis = await UserAnalysis.get(PydanticObjectId(analysis_id))
+        analysis = await analysis_writer.load(PydanticObjectId(analysis_id))
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
-        return analysis
+        
+        # Unchanged since the client's copy: skip loading texts and serializing
+        etag = make_etag(analysis.id, analysis.updated_at.isoformat())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        resume_text, job_description = await document_store.texts_for(analysis)
+        return FastJSONResponse({
+            "id": str(analysis.id),
+            "user_id": analysis.user_id,
+            "resume_text": resume_text,
+            "job_description": job_description,
+            "analysis_result": analysis_service.expand_result(analysis.analysis_result),
+            "created_at": analysis.created_at,
+            "updated_at": analysis.updated_at
+        }, headers=cache_headers(etag))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
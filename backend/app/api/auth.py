@@ -1,55 +1,81 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import timedelta
+from typing import Optional, Tuple
+from pymongo.errors import DuplicateKeyError
 from app.models import User, UserCreate, UserLogin, Token, UserResponse
-from app.services.auth_service import auth_service
+from app.services.auth_service import auth_service, TokenData
+from app.services.user_cache import user_cache
 
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+async def _authenticate(token: str) -> Tuple[Optional[TokenData], Optional[User]]:
+    """Decode a token and load its user, reusing recent results"""
+    token_data = user_cache.get_token(token)
+    if token_data is None:
+        token_data = auth_service.verify_token(token)
+        if token_data is None or token_data.user_id is None:
+            return None, None
+        user_cache.put_token(token, token_data)
+    
+    user = user_cache.get_user(token_data.user_id)
+    if user is None:
+        user = await User.find_one(User.id == token_data.user_id)
+        if user is not None:
+            user_cache.put_user(user)
+    
+    return token_data, user
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Dependency to get current authenticated user"""
-    token_data = auth_service.verify_token(credentials.credentials)
+    token_data, user = await _authenticate(credentials.credentials)
     
-    if token_data is None or token_data.user_id is None:
+    if token_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = await User.find_one(User.id == token_data.user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
+    # A deactivation in another worker reaches this one within AUTH_CACHE_TTL
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is inactive"
+        )
+    
+    return user
+
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[User]:
+    """Dependency to get the authenticated user if a valid token was sent"""
+    if credentials is None:
+        return None
+    
+    _, user = await _authenticate(credentials.credentials)
+    if user is not None and not user.is_active:
+        return None
     return user
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = await User.find_one(User.email == user_data.email)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    existing_username = await User.find_one(User.username == user_data.username)
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
-    
-    # Create new user
-    hashed_password = auth_service.get_password_hash(user_data.password)
+    # Create new user; the unique email and username indexes reject duplicates
+    hashed_password = await auth_service.hash_password(user_data.password)
     user = User(
         email=user_data.email,
         username=user_data.username,
@@ -57,7 +83,15 @@ async def register(user_data: UserCreate):
         full_name=user_data.full_name
     )
     
-    await user.insert()
+    try:
+        await user.insert()
+    except DuplicateKeyError as e:
+        key_pattern = (e.details or {}).get("keyPattern") or {}
+        if "username" in key_pattern or "username_unique" in str(e):
+            detail = "Username already taken"
+        else:
+            detail = "Email already registered"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
     
     return UserResponse(
         id=str(user.id),
@@ -82,7 +116,8 @@ async def login(credentials: UserLogin):
         )
     
     # Verify password
-    if not auth_service.verify_password(credentials.password, user.hashed_password):
+    valid, new_hash = await auth_service.verify_and_update(credentials.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -94,6 +129,11 @@ async def login(credentials: UserLogin):
             detail="Account is inactive"
         )
     
+    # Stored hash uses an old bcrypt cost; replace it now that we have the password
+    if new_hash:
+        await user.set({User.hashed_password: new_hash})
+        user_cache.invalidate_user(user.id)
+    
     # Create access token
     access_token = auth_service.create_access_token(
         data={"sub": str(user.id), "email": user.email}
@@ -123,7 +163,11 @@ async def update_user_profile(
     """Update current user profile"""
     if full_name:
         current_user.full_name = full_name
-        await current_user.save()
+        try:
+            await current_user.save()
+        finally:
+            # Drop the cached copy so the next request loads the new name
+            user_cache.invalidate_user(current_user.id)
     
     return UserResponse(
         id=str(current_user.id),
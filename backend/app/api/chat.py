@@ -1,28 +1,52 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from app.models import ChatMessage, ChatRequest
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
+from typing import List, Optional
+import re
+import secrets
+from app.models import ChatMessage, ChatRequest, User
 from app.services.llm_service import llm_service
+from app.services.chat_session_service import chat_session_store
+from app.api.auth import get_optional_user
+from app.serialization import make_etag, etag_matches, not_modified, cache_headers
 
 
 router = APIRouter()
 
-# In-memory chat history (in production, use database or session storage)
-chat_sessions = {}
+
+# Anonymous callers get a random client ID from the server in this header and
+# send it back to reach their own sessions
+CHAT_CLIENT_HEADER = "X-Chat-Client"
+_CLIENT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def _session_owner(user: Optional[User], client_id: Optional[str] = None) -> Optional[str]:
+    """Resolve the session owner key for a request (None for an anonymous caller without a client ID)"""
+    if user:
+        return str(user.id)
+    if client_id and _CLIENT_ID_PATTERN.match(client_id):
+        return f"anonymous:{client_id}"
+    return None
 
 
 @router.post("/message", response_model=ChatMessage)
-async def send_chat_message(request: ChatRequest):
+async def send_chat_message(
+    request: ChatRequest,
+    response: Response,
+    current_user: Optional[User] = Depends(get_optional_user),
+    x_chat_client: Optional[str] = Header(None)
+):
     """
     Send a message to the AI career coach chatbot
     """
     try:
-        # Get or create session history
-        session_id = "default"  # In production, use user session ID
-        if session_id not in chat_sessions:
-            chat_sessions[session_id] = []
+        user_id = _session_owner(current_user, x_chat_client)
+        if current_user is None:
+            if user_id is None:
+                x_chat_client = secrets.token_urlsafe(24)
+                user_id = _session_owner(None, x_chat_client)
+            response.headers[CHAT_CLIENT_HEADER] = x_chat_client
         
         # Get chat history
-        history = chat_sessions[session_id]
+        history = await chat_session_store.get_history(user_id, request.session_id)
         
         # Generate response
         response_text = await llm_service.chat_response(
@@ -31,16 +55,15 @@ async def send_chat_message(request: ChatRequest):
             chat_history=history
         )
         
-        # Save to history
+        # Save to history (bounded to the configured session length)
         user_msg = ChatMessage(role="user", content=request.message)
         assistant_msg = ChatMessage(role="assistant", content=response_text)
-        
-        history.append(user_msg.dict())
-        history.append(assistant_msg.dict())
-        
-        # Keep only last 20 messages
-        if len(history) > 20:
-            chat_sessions[session_id] = history[-20:]
+        await chat_session_store.append(
+            user_id,
+            request.session_id,
+            user_msg.model_dump(),
+            assistant_msg.model_dump()
+        )
         
         return assistant_msg
         
@@ -52,19 +75,36 @@ async def send_chat_message(request: ChatRequest):
 
 
 @router.get("/history", response_model=List[ChatMessage])
-async def get_chat_history():
-    """Get chat history"""
-    session_id = "default"
-    if session_id not in chat_sessions:
+async def get_chat_history(
+    request: Request,
+    response: Response,
+    session_id: str = "default",
+    current_user: Optional[User] = Depends(get_optional_user),
+    x_chat_client: Optional[str] = Header(None)
+):
+    """Get chat history (supports If-None-Match)"""
+    user_id = _session_owner(current_user, x_chat_client)
+    if user_id is None:
         return []
+    history = await chat_session_store.get_history(user_id, session_id)
+    
+    # Sessions only grow or get cleared; length and the newest message version them
+    etag = make_etag(user_id, session_id, len(history), history[-1].get("timestamp") if history else None)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
     
-    return [ChatMessage(**msg) for msg in chat_sessions[session_id]]
+    return [ChatMessage(**msg) for msg in history]
 
 
 @router.delete("/history")
-async def clear_chat_history():
+async def clear_chat_history(
+    session_id: str = "default",
+    current_user: Optional[User] = Depends(get_optional_user),
+    x_chat_client: Optional[str] = Header(None)
+):
     """Clear chat history"""
-    session_id = "default"
-    if session_id in chat_sessions:
-        chat_sessions[session_id] = []
+    user_id = _session_owner(current_user, x_chat_client)
+    if user_id is not None:
+        await chat_session_store.clear(user_id, session_id)
     return {"message": "Chat history cleared"}
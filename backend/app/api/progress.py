@@ -1,13 +1,53 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Dict, List, Optional
 from datetime import datetime
 from beanie import PydanticObjectId
-from app.models import UserProgress
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.models import UserProgress, ProgressBulkCreate, ProgressUpdate
+from app.database import read_collection
+from app.services.analysis_writer import analysis_writer
+from app.serialization import make_etag, etag_matches, not_modified, cache_headers
 
 
 router = APIRouter()
 
 
+def _object_id(value: str) -> PydanticObjectId:
+    try:
+        return PydanticObjectId(value)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid progress ID: {value}")
+
+
+def _update_operations(
+    current_level: Optional[float] = None,
+    completed_resources: Optional[List[str]] = None,
+    add_resources: Optional[List[str]] = None,
+    notes: Optional[str] = None
+) -> Dict:
+    """Atomic update document for a progress tracker"""
+    if completed_resources is not None and add_resources:
+        raise HTTPException(
+            status_code=400,
+            detail="Use either completed_resources or add_resources, not both"
+        )
+
+    fields = {"updated_at": datetime.utcnow()}
+    if current_level is not None:
+        fields["current_level"] = current_level
+    if completed_resources is not None:
+        fields["completed_resources"] = completed_resources
+    if notes is not None:
+        fields["notes"] = notes
+
+    operations = {"$set": fields}
+    if add_resources:
+        operations["$addToSet"] = {"completed_resources": {"$each": add_resources}}
+    return operations
+
+
 @router.post("/", response_model=UserProgress)
 async def create_progress(
     user_id: str,
@@ -25,6 +65,66 @@ async def create_progress(
         )
         await progress.insert()
         return progress
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=f"Already tracking {skill}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error creating progress: {str(e)}"
+        )
+
+
+@router.post("/bulk", response_model=List[UserProgress])
+async def create_progress_bulk(request: ProgressBulkCreate):
+    """Create trackers for several skills at once, skipping skills already tracked
+
+    With analysis_id, the analysis's missing skills are added to the list.
+    Returns the trackers that were created. The unique (user_id, skill)
+    index settles races with concurrent requests for the same skills.
+    """
+    skills = list(request.skills)
+    if request.analysis_id:
+        try:
+            analysis = await analysis_writer.load(PydanticObjectId(request.analysis_id))
+        except Exception:
+            analysis = None
+        if not analysis:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        skills.extend(gap["skill"] for gap in analysis.analysis_result.get("missing_skills", []))
+
+    try:
+        collection = UserProgress.get_motor_collection()
+        # Served from the (user_id, skill) index. Names compare exactly, like the
+        # unique index and single create, so "Docker" and "docker" are separate trackers
+        tracked = set(await collection.distinct("skill", {"user_id": request.user_id}))
+
+        now = datetime.utcnow()
+        created = []
+        for skill in skills:
+            skill = skill.strip()
+            if not skill or skill in tracked:
+                continue
+            tracked.add(skill)
+            created.append(UserProgress(
+                id=PydanticObjectId(),
+                user_id=request.user_id,
+                skill=skill,
+                target_level=request.target_level,
+                started_at=now,
+                updated_at=now
+            ))
+
+        if created:
+            try:
+                await UserProgress.insert_many(created, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                # A concurrent request created these trackers first
+                skipped = {error["index"] for error in errors}
+                created = [progress for i, progress in enumerate(created) if i not in skipped]
+        return created
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -33,13 +133,18 @@ async def create_progress(
 
 
 @router.get("/{user_id}", response_model=List[UserProgress])
-async def get_user_progress(user_id: str):
-    """Get all progress for a user"""
+async def get_user_progress(user_id: str, request: Request, response: Response):
+    """Get all progress for a user (supports If-None-Match)"""
     try:
-        progress_list = await UserProgress.find(
-            UserProgress.user_id == user_id
-        ).to_list()
-        return progress_list
+        documents = await read_collection(UserProgress).find({"user_id": user_id}).to_list(length=None)
+        
+        # Every write sets updated_at, so IDs plus timestamps version the list
+        etag = make_etag(user_id, *(f"{document['_id']}:{document.get('updated_at')}" for document in documents))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers.update(cache_headers(etag))
+        
+        return [UserProgress(**document) for document in documents]
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -47,6 +152,100 @@ async def get_user_progress(user_id: str):
         )
 
 
+@router.get("/{user_id}/summary")
+async def get_progress_summary(user_id: str):
+    """Per-user progress totals and per-skill completion, computed in one aggregation"""
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$project": {
+            "skill": 1,
+            "current_level": 1,
+            "updated_at": 1,
+            "resources": {"$size": {"$ifNull": ["$completed_resources", []]}},
+            "ratio": {"$cond": [
+                {"$gt": ["$target_level", 0]},
+                {"$min": [1, {"$divide": ["$current_level", "$target_level"]}]},
+                1
+            ]}
+        }},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [{"$gte": ["$ratio", 1]}, 1, 0]}},
+            "not_started": {"$sum": {"$cond": [
+                {"$and": [{"$lte": ["$current_level", 0]}, {"$lt": ["$ratio", 1]}]}, 1, 0
+            ]}},
+            "average_progress": {"$avg": "$ratio"},
+            "completed_resources": {"$sum": "$resources"},
+            "last_updated": {"$max": "$updated_at"},
+            "skills": {"$push": {"id": {"$toString": "$_id"}, "skill": "$skill", "progress": "$ratio"}}
+        }}
+    ]
+
+    try:
+        results = await read_collection(UserProgress).aggregate(pipeline).to_list(length=1)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error summarizing progress: {str(e)}"
+        )
+
+    if not results:
+        return {
+            "user_id": user_id,
+            "total": 0,
+            "completed": 0,
+            "in_progress": 0,
+            "not_started": 0,
+            "average_progress": 0.0,
+            "completed_resources": 0,
+            "last_updated": None,
+            "skills": []
+        }
+
+    summary = results[0]
+    return {
+        "user_id": user_id,
+        "total": summary["total"],
+        "completed": summary["completed"],
+        "in_progress": summary["total"] - summary["completed"] - summary["not_started"],
+        "not_started": summary["not_started"],
+        "average_progress": round(summary["average_progress"] or 0.0, 4),
+        "completed_resources": summary["completed_resources"],
+        "last_updated": summary["last_updated"],
+        "skills": [
+            {**skill, "progress": round(skill["progress"], 4)}
+            for skill in summary["skills"]
+        ]
+    }
+
+
+@router.put("/bulk")
+async def update_progress_bulk(updates: List[ProgressUpdate]):
+    """Apply several progress updates in one bulk write"""
+    if not updates:
+        return {"matched": 0, "modified": 0}
+
+    operations = [
+        UpdateOne(
+            {"_id": _object_id(update.id)},
+            _update_operations(
+                update.current_level, update.completed_resources, update.add_resources, update.notes
+            )
+        )
+        for update in updates
+    ]
+
+    try:
+        result = await UserProgress.get_motor_collection().bulk_write(operations, ordered=False)
+        return {"matched": result.matched_count, "modified": result.modified_count}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error updating progress: {str(e)}"
+        )
+
+
 @router.put("/{progress_id}")
 async def update_progress(
     progress_id: str,
@@ -55,29 +254,23 @@ async def update_progress(
     notes: Optional[str] = None
 ):
     """Update skill progress"""
+    object_id = _object_id(progress_id)
     try:
-        progress = await UserProgress.get(PydanticObjectId(progress_id))
-        
-        if not progress:
-            raise HTTPException(status_code=404, detail="Progress not found")
-        
-        if current_level is not None:
-            progress.current_level = current_level
-        if completed_resources is not None:
-            progress.completed_resources = completed_resources
-        if notes is not None:
-            progress.notes = notes
-        
-        progress.updated_at = datetime.utcnow()
-        await progress.save()
-        
-        return progress
+        document = await UserProgress.get_motor_collection().find_one_and_update(
+            {"_id": object_id},
+            _update_operations(current_level, completed_resources, notes=notes),
+            return_document=ReturnDocument.AFTER
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error updating progress: {str(e)}"
         )
 
+    if not document:
+        raise HTTPException(status_code=404, detail="Progress not found")
+    return UserProgress(**document)
+
 
 @router.delete("/{progress_id}")
 async def delete_progress(progress_id: str):
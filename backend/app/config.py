@@ -10,10 +10,20 @@ class Settings(BaseSettings):
     # API Keys
     openai_api_key: Optional[str] = None
     gemini_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None  # Override for OpenAI-compatible endpoints
     
-    # Database
+    # Database ("mongomock://" uses an in-memory stand-in, requires mongomock-motor)
     mongodb_uri: str = "mongodb://localhost:27017"
     database_name: str = "skill_gap_analyzer"
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = 300000  # Close pooled connections idle this long
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_connect_timeout_ms: int = 10000
+    mongo_socket_timeout_ms: Optional[int] = None  # None waits indefinitely
+    mongo_compressors: str = ""  # Wire compression, e.g. "zstd,snappy,zlib"
+    mongo_history_read_preference: str = "primary"  # e.g. "secondaryPreferred" on replica sets
+    mongo_health_check_interval: float = 15.0  # Seconds between background pings for /health
     
     # Application
     environment: str = "development"
@@ -26,9 +36,57 @@ class Settings(BaseSettings):
     use_gemini: bool = True
     model_name: str = "gemini-1.5-flash"
     similarity_threshold: float = 0.7
+    skill_taxonomy_path: str = os.path.join(os.path.dirname(__file__), "data", "skill_taxonomy.json")
+    prompt_token_budget: int = 1500  # Estimated tokens allowed per LLM prompt
+    roadmap_batch_size: int = 5  # Skills per batched roadmap request
+    roadmap_max_skills: int = 20  # Skills accepted per roadmap request
+    roadmap_tokens_per_skill: int = 400  # Output tokens reserved for each roadmap in a batch
+    llm_output_tokens: int = 500  # Default completion budget per LLM call
+    llm_max_output_tokens: int = 3000  # Largest completion budget a batched call may ask for
+    roadmap_cache_size: int = 256  # Cached roadmaps per worker
+    analysis_workers: int = 2  # Threads running analyses per worker (model inference releases the GIL)
+    taxonomy_poll_interval: float = 30.0  # Seconds between checks for a newly published taxonomy
+    
+    # LLM Provider Protection
+    llm_timeout_seconds: float = 15.0  # Latency SLO per LLM call
+    llm_rate_limit_per_minute: float = 60.0
+    llm_rate_limit_burst: int = 10
+    llm_rate_limit_max_wait: float = 1.0  # Seconds to wait for a token before falling back
+    llm_slow_call_seconds: float = 8.0  # Calls slower than this count as failures
+    llm_breaker_window: int = 10  # Recent calls tracked by the circuit breaker
+    llm_breaker_failure_ratio: float = 0.5
+    llm_breaker_cooldown: float = 30.0  # Seconds the breaker stays open
+    
+    # Analysis History
+    history_count_ttl: int = 60  # Seconds a per-user history count is cached
+    document_compression: bool = True  # zlib-compress stored resume/JD texts
+    document_compression_min_bytes: int = 512  # Smaller texts are stored as-is
+    analysis_write_batch_size: int = 50  # Analyses per insert_many
+    analysis_flush_interval: float = 1.0  # Seconds between write-behind flushes
+    analysis_write_max_queue: int = 1000  # Queued analyses before writers wait for a flush
+    
+    # Chat Sessions
+    chat_history_limit: int = 20  # Messages kept per session
+    chat_max_sessions: int = 1000  # Active sessions cached per worker
+    chat_session_ttl: int = 30  # Seconds before an idle cached session is reloaded
+    chat_flush_interval: float = 2.0  # Seconds between write-behind flushes
+    
+    # Profiling (admin-only sampling profiler, off unless enabled)
+    profiler_enabled: bool = False
+    profiler_max_seconds: float = 60.0  # Longest allowed profiling session
     
     # Authentication
     jwt_secret_key: str = "CHANGE-THIS-TO-SECURE-RANDOM-VALUE-IN-PRODUCTION"
+    admin_api_key: Optional[str] = None  # Enables /api/admin endpoints (X-Admin-Key header)
+    password_hash_rounds: int = 12  # bcrypt cost; hashes with another cost are redone on login
+    password_hash_workers: int = 4  # Concurrent bcrypt operations per worker
+    auth_cache_ttl: float = 30.0  # Seconds a decoded token or loaded user is reused
+    auth_cache_size: int = 1024  # Cached tokens and users per worker
+    
+    # Response compression
+    compression_minimum_size: int = 1024  # Smaller bodies are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5  # Used when the optional brotli package is installed
     
     # CORS
     cors_origins: List[str] = []
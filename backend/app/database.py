@@ -1,28 +1,161 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional, Type
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from beanie import Document, init_beanie
+from pymongo import monitoring
+from pymongo.read_preferences import ReadPreference
 from app.config import settings
-from app.models import UserAnalysis, UserProgress, User
+from app.models import (
+    UserAnalysis, UserProgress, User, ChatSession, ResumeDocument, JobDescriptionDocument, SkillTaxonomyRevision
+)
+from app.services.metrics import mongo_command_duration
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records MongoDB command latency from driver command events"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
 
 
 class Database:
     client: AsyncIOMotorClient = None
+    # Last connectivity check, refreshed in the background and served by /health
+    health: Dict = {"database": "not_initialized"}
+    health_task: Optional[asyncio.Task] = None
 
 
 db = Database()
 
 
+def client_options() -> Dict:
+    """Motor client options from settings (values in the URI still take precedence)"""
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "socketTimeoutMS": settings.mongo_socket_timeout_ms,
+        "event_listeners": [CommandMetricsListener()],
+    }
+    if settings.mongo_compressors:
+        # zstd needs the zstandard package and snappy python-snappy; pymongo skips unavailable ones
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+
+def read_collection(document: Type[Document]) -> AsyncIOMotorCollection:
+    """Collection for history-style reads, using the configured read preference"""
+    read_preference = READ_PREFERENCES.get(settings.mongo_history_read_preference)
+    if read_preference is None:
+        raise ValueError(f"Unknown read preference: {settings.mongo_history_read_preference}")
+    collection = document.get_motor_collection()
+    # Primary is the default already; mongomock's with_options returns a sync collection
+    if read_preference == ReadPreference.PRIMARY or settings.mongodb_uri.startswith("mongomock://"):
+        return collection
+    return collection.with_options(read_preference=read_preference)
+
+
+async def check_unique_indexes(database, document_models):
+    """Fail with a clear error if existing data would break a new unique index
+    
+    init_beanie creates missing indexes, and a unique one fails on a
+    collection that already holds duplicates. Indexes that already exist
+    are skipped, so this only scans a collection until its index is built.
+    """
+    problems = []
+    for document in document_models:
+        document_settings = getattr(document, "Settings", None)
+        name = getattr(document_settings, "name", None)
+        indexes = getattr(document_settings, "indexes", None) or []
+        if not name or not indexes:
+            continue
+        collection = database[name]
+        existing = await collection.index_information()
+        for index in indexes:
+            spec = index.document
+            if not spec.get("unique") or spec["name"] in existing:
+                continue
+            fields = list(spec["key"].keys())
+            duplicates = await collection.aggregate([
+                {"$group": {"_id": {field: f"${field}" for field in fields}, "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": 1}}},
+                {"$limit": 5}
+            ]).to_list(length=5)
+            if duplicates:
+                examples = ", ".join(str(duplicate["_id"]) for duplicate in duplicates)
+                problems.append(f"{name}.{spec['name']} ({', '.join(fields)}): duplicates such as {examples}")
+    if problems:
+        raise RuntimeError(
+            "Cannot create unique indexes because existing documents repeat their keys. "
+            "Remove or merge the duplicates (see 'Upgrading an existing database' in the README), "
+            "then restart. " + "; ".join(problems)
+        )
+
+
+async def check_connectivity():
+    """Ping the database and cache the result for /health"""
+    try:
+        await db.client.admin.command('ping')
+        db.health = {"database": "connected", "checked_at": datetime.utcnow()}
+    except Exception as e:
+        db.health = {"database": "error", "database_error": str(e), "checked_at": datetime.utcnow()}
+
+
+async def _health_loop():
+    """Refresh the cached connectivity state"""
+    while True:
+        await asyncio.sleep(settings.mongo_health_check_interval)
+        await check_connectivity()
+
+
 async def connect_to_mongo():
     """Connect to MongoDB"""
-    db.client = AsyncIOMotorClient(settings.mongodb_uri)
-    await init_beanie(
-        database=db.client[settings.database_name],
-        document_models=[UserAnalysis, UserProgress, User]
-    )
+    if settings.mongodb_uri.startswith("mongomock://"):
+        # In-memory stand-in for local load testing
+        from mongomock_motor import AsyncMongoMockClient
+        db.client = AsyncMongoMockClient()
+    else:
+        db.client = AsyncIOMotorClient(settings.mongodb_uri, **client_options())
+    database = db.client[settings.database_name]
+    document_models = [
+        UserAnalysis, UserProgress, User, ChatSession,
+        ResumeDocument, JobDescriptionDocument, SkillTaxonomyRevision
+    ]
+    await check_unique_indexes(database, document_models)
+    await init_beanie(database=database, document_models=document_models)
     print(f"Connected to MongoDB: {settings.database_name}")
+    
+    await check_connectivity()
+    db.health_task = asyncio.create_task(_health_loop())
 
 
 async def close_mongo_connection():
     """Close MongoDB connection"""
+    if db.health_task is not None:
+        db.health_task.cancel()
+        try:
+            await db.health_task
+        except asyncio.CancelledError:
+            pass
+        db.health_task = None
     if db.client:
         db.client.close()
         print("Closed MongoDB connection")
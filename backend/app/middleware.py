@@ -0,0 +1,156 @@
+import gzip
+import time
+from app.services import tracing
+from app.services.profiler import profiler
+from app.services.metrics import http_request_duration, http_requests_in_progress
+
+# brotli is optional; without it responses are only gzip-compressed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class MetricsMiddleware:
+    """Times every HTTP request per route and runs it under a trace
+
+    Implemented as plain ASGI middleware so the timing covers the whole
+    response, including streamed (SSE) bodies. The trace ID is taken from
+    an incoming W3C traceparent header when present and returned in the
+    X-Trace-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1")
+        trace, token = tracing.start_trace(
+            f"{method} {scope['path']}", tracing.parse_traceparent(traceparent)
+        )
+        status = 500
+
+        async def send_with_trace_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-trace-id", trace.trace_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        profile_session = profiler.request_started(scope["path"])
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_progress.dec()
+            if profile_session is not None:
+                profiler.request_finished(profile_session)
+            # Route template rather than raw path keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration.observe(duration, method=method, route=route, status=str(status))
+            trace.name = f"{method} {route}"
+            tracing.end_trace(trace, token)
+
+
+class CompressionMiddleware:
+    """Compresses response bodies with brotli or gzip, per Accept-Encoding
+
+    Only complete bodies of at least minimum_size bytes are compressed.
+    Streamed responses (SSE progress events) pass through untouched so
+    every event is delivered as soon as it is sent.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, accept_encoding: str):
+        accepted = set()
+        for part in accept_encoding.split(","):
+            name, _, params = part.partition(";")
+            quality = 1.0
+            params = params.replace(" ", "")
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    pass
+            if quality > 0:
+                accepted.add(name.strip().lower())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = self._choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                response_headers = {key.lower(): value for key, value in message.get("headers", [])}
+                if b"content-encoding" in response_headers or message["status"] in (204, 304):
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            # Streamed bodies (and small ones) are sent as they are
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            response_headers = [
+                (key, value) for key, value in start_message.get("headers", [])
+                if key.lower() != b"content-length"
+            ]
+            response_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import List, Optional, Dict
 from pydantic import BaseModel, Field, EmailStr
-from beanie import Document
+from beanie import Document, PydanticObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
 class Skill(BaseModel):
@@ -57,17 +58,94 @@ class AnalysisRequest(BaseModel):
     resume_file_path: Optional[str] = None
 
 
+class RoadmapRequest(BaseModel):
+    """Learning roadmap request for one or more skills"""
+    skills: List[str]
+    current_level: str = "beginner"
+    target_level: str = "intermediate"
+    timeframe: str = "8 weeks"
+
+
+class StoredText(Document):
+    """Text stored once per distinct content, keyed by its SHA-256 hash"""
+    id: str
+    content: bytes
+    encoding: str = "utf-8"  # "utf-8" or "zlib" (compressed UTF-8)
+    length: int = 0  # Characters in the original text
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ResumeDocument(StoredText):
+    """Content-addressed resume text"""
+    
+    class Settings:
+        name = "resumes"
+
+
+class JobDescriptionDocument(StoredText):
+    """Content-addressed job description text"""
+    
+    class Settings:
+        name = "job_descriptions"
+
+
+class SkillTaxonomyRevision(Document):
+    """A skill taxonomy published through the admin API
+    
+    Each reload inserts the next revision; workers load the newest one.
+    """
+    revision: int
+    version: str
+    data: Dict
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "skill_taxonomies"
+        indexes = [
+            IndexModel([("revision", DESCENDING)], name="revision_unique", unique=True)
+        ]
+
+
 class UserAnalysis(Document):
-    """Stored user analysis in database"""
+    """Stored user analysis in database
+    
+    Resume and job description texts live in their own content-addressed
+    collections and are referenced by hash. Analyses saved before that
+    carry resume_text and job_description inline.
+    """
     user_id: Optional[str] = None
-    resume_text: str
-    job_description: str
-    analysis_result: Dict
+    resume_hash: Optional[str] = None
+    job_description_hash: Optional[str] = None
+    resume_text: Optional[str] = None
+    job_description: Optional[str] = None
+    analysis_result: Dict  # Compact form, see AnalysisService.compact_result
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "user_analyses"
+        indexes = [
+            # Per-user history, newest first; _id breaks created_at ties for keyset pagination
+            IndexModel(
+                [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="user_history"
+            )
+        ]
+
+
+class AnalysisSummary(BaseModel):
+    """Projection of a stored analysis with only the fields history pages show"""
+    id: PydanticObjectId = Field(alias="_id")
+    created_at: datetime
+    analysis_result: Dict = {}
+    
+    class Settings:
+        projection = {
+            "_id": 1,
+            "created_at": 1,
+            "analysis_result.skill_match_percentage": 1,
+            "analysis_result.profile_fit_score": 1
+        }
 
 
 class UserProgress(Document):
@@ -83,6 +161,27 @@ class UserProgress(Document):
     
     class Settings:
         name = "user_progress"
+        indexes = [
+            # Per-user listing and summaries; one tracker per user and skill
+            IndexModel([("user_id", ASCENDING), ("skill", ASCENDING)], name="user_skill", unique=True)
+        ]
+
+
+class ProgressBulkCreate(BaseModel):
+    """Progress trackers to create for a user, from skills and/or an analysis's missing skills"""
+    user_id: str
+    skills: List[str] = []
+    analysis_id: Optional[str] = None
+    target_level: float = 1.0
+
+
+class ProgressUpdate(BaseModel):
+    """One entry of a bulk progress update"""
+    id: str
+    current_level: Optional[float] = None
+    completed_resources: Optional[List[str]] = None  # Replaces the list
+    add_resources: Optional[List[str]] = None  # Appended unless already completed
+    notes: Optional[str] = None
 
 
 class ChatMessage(BaseModel):
@@ -96,6 +195,25 @@ class ChatRequest(BaseModel):
     """Chat request model"""
     message: str
     context: Optional[Dict] = None  # Analysis context for personalized advice
+    session_id: str = "default"
+
+
+class ChatSession(Document):
+    """Persisted chat session history for a user"""
+    user_id: str
+    session_id: str = "default"
+    messages: List[Dict] = []
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "chat_sessions"
+        indexes = [
+            IndexModel(
+                [("user_id", ASCENDING), ("session_id", ASCENDING)],
+                unique=True
+            )
+        ]
 
 
 class User(Document):
@@ -110,6 +228,11 @@ class User(Document):
     
     class Settings:
         name = "users"
+        indexes = [
+            # Login looks users up by email; registration relies on both being unique
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+            IndexModel([("username", ASCENDING)], name="username_unique", unique=True)
+        ]
 
 
 class UserCreate(BaseModel):
@@ -0,0 +1,95 @@
+import json
+import hashlib
+from datetime import date, datetime
+from typing import Any, Dict
+from bson import ObjectId
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+# orjson is optional; the standard library encoder is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any):
+    """Types neither encoder handles natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "item"):
+        return value.item()  # numpy scalars
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes; pydantic models are serialized by pydantic-core"""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with dumps()
+
+    Returning one directly from an endpoint also skips FastAPI's
+    jsonable_encoder pass over the content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def sse_event(data: Dict, **models: BaseModel) -> bytes:
+    """Encode one SSE data frame
+
+    Models passed as keywords are added to data under their keyword and
+    serialized straight to JSON, without an intermediate dict.
+    """
+    body = dumps(data)[1:-1]
+    fields = [body] if body else []
+    fields.extend(dumps(key) + b":" + model.model_dump_json().encode("utf-8") for key, model in models.items())
+    return b"data: {" + b",".join(fields) + b"}\n\n"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from version parts (IDs, updated_at timestamps, counts)
+
+    Weak, so it stays valid for the compressed and uncompressed bodies.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in header.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a matching conditional GET"""
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Validator headers: clients may keep the body but must revalidate it"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
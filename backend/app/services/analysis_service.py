@@ -1,5 +1,16 @@
-from typing import Dict, List
-from app.services.nlp_service import nlp_service
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from app.config import settings
+from app.services.nlp_service import nlp_service, cosine_similarity_numpy
+from app.services.skill_vocabulary import SkillSet
+from app.services.importance import score_importance
+from app.services.metrics import record_cache, run_in_executor
+from app.services.tracing import span
 from app.models import (
     Skill, SkillGap, AnalysisResult, 
     ImprovementSuggestion, LearningResource
@@ -11,44 +22,92 @@ class AnalysisService:
     
     def __init__(self):
         self.nlp = nlp_service
+        # Content-addressed caches so edited resumes only reprocess what changed
+        self._chunk_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._job_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.chunk_cache_size = 2048
+        self.job_cache_size = 256
+        # Analyses run on these threads, so the caches above are shared between them
+        self._cache_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(settings.analysis_workers, 1), thread_name_prefix="analysis"
+        )
     
     async def analyze(self, resume_text: str, job_description: str) -> AnalysisResult:
         """Perform complete analysis"""
+        result, _ = await self.run_analysis(resume_text, job_description)
+        return result
+    
+    async def run_analysis(
+        self,
+        resume_text: str,
+        job_description: str,
+        previous_resume_text: Optional[str] = None
+    ) -> Tuple[AnalysisResult, Dict[str, int]]:
+        """analyze_incremental on an analysis thread, keeping the event loop free"""
+        return await run_in_executor(
+            "analysis", self.analyze_incremental, resume_text, job_description, previous_resume_text,
+            executor=self._executor
+        )
+    
+    def analyze_incremental(
+        self,
+        resume_text: str,
+        job_description: str,
+        previous_resume_text: Optional[str] = None
+    ) -> Tuple[AnalysisResult, Dict[str, int]]:
+        """Perform analysis, reusing cached job description and resume chunk features
+        
+        The resume is split into chunks that are extracted and embedded
+        independently, so re-running after an edit only reprocesses the changed
+        chunks. Returns the result and chunk reuse stats.
+        """
+        with span("analysis.job_features"):
+            job = self._job_features(job_description)
+        with span("analysis.resume_chunks"):
+            chunks = self._split_chunks(resume_text)
+            chunk_features, reused = self._chunk_features(chunks)
         
-        # Extract skills from both texts
-        resume_skills = self.nlp.extract_skills_from_text(resume_text)
-        job_skills = self.nlp.extract_skills_from_text(job_description)
+        stats = {"chunks": len(chunks), "reused_chunks": reused, "changed_chunks": len(chunks) - reused}
+        if previous_resume_text is not None:
+            previous = {self._hash(c) for c in self._split_chunks(previous_resume_text)}
+            stats["changed_chunks"] = sum(1 for c in chunks if self._hash(c) not in previous)
         
-        # Get skill names
-        resume_skill_names = [s['name'] for s in resume_skills]
-        job_skill_names = [s['name'] for s in job_skills]
+        taxonomy = self.nlp.taxonomy
+        vocabulary = taxonomy.vocabulary
+        
+        # Merge per-chunk skill sets (highest experience wins)
+        resume_skills = vocabulary.union(f['skill_set'] for f in chunk_features)
+        job_skills = job['skill_set']
         
         # Compute skill match
-        match_percentage, matched_skill_names, missing_skill_names = self.nlp.compute_skill_match(
-            resume_skill_names, 
-            job_skill_names
-        )
+        with span("analysis.skill_match"):
+            match_percentage, matched_ids, missing_ids = self.nlp.match_skill_sets(
+                resume_skills, 
+                job_skills
+            )
+        missing_skill_names = [vocabulary.display_names[i] for i in missing_ids]
         
         # Compute overall semantic similarity
-        overall_similarity = self.nlp.compute_semantic_similarity(
-            resume_text, 
-            job_description
-        )
+        with span("analysis.similarity"):
+            overall_similarity = self._resume_job_similarity(chunks, chunk_features, job['embedding'])
         
         # Calculate profile fit score (weighted combination)
         profile_fit_score = (match_percentage * 0.7 + overall_similarity * 100 * 0.3)
         
         # Build matched skills list
         matched_skills = [
-            Skill(name=name, category=self._get_skill_category(name, job_skills))
-            for name in matched_skill_names
+            Skill(name=vocabulary.display_names[i], category=vocabulary.categories[i])
+            for i in matched_ids
         ]
         
         # Build missing skills list
+        with span("analysis.importance"):
+            importance = score_importance(missing_skill_names, job_description, taxonomy)
         missing_skills = [
             SkillGap(
                 skill=name,
-                importance=self._determine_importance(name, job_description),
+                importance=importance[name],
                 current_level=0.0,
                 required_level=0.8
             )
@@ -56,15 +115,17 @@ class AnalysisService:
         ]
         
         # Identify weak skills (skills in resume but maybe not strong enough)
-        weak_skills = self._identify_weak_skills(resume_text, job_description, matched_skills)
+        with span("analysis.weak_skills"):
+            weak_skills = self._identify_weak_skills(resume_skills, job_skills)
         
         # Generate improvement suggestions
-        improvement_suggestions = self._generate_improvement_suggestions(
-            missing_skills, 
-            weak_skills
-        )
+        with span("analysis.suggestions"):
+            improvement_suggestions = self._generate_improvement_suggestions(
+                missing_skills, 
+                weak_skills
+            )
         
-        return AnalysisResult(
+        result = AnalysisResult(
             skill_match_percentage=round(match_percentage, 2),
             profile_fit_score=round(profile_fit_score, 2),
             matched_skills=matched_skills,
@@ -78,70 +139,149 @@ class AnalysisService:
                 len(missing_skills)
             )
         )
+        return result, stats
+    
+    def compact_result(self, result: AnalysisResult) -> Dict:
+        """Stored form of a result, without the improvement suggestions derived from its gaps"""
+        return result.model_dump(exclude={'improvement_suggestions'}, exclude_none=True)
+    
+    def expand_result(self, stored: Dict) -> Dict:
+        """Rebuild a full result from its stored form"""
+        if 'improvement_suggestions' in stored:
+            # Stored before results were compacted
+            return stored
+        result = AnalysisResult(improvement_suggestions=[], **stored)
+        result.improvement_suggestions = self._generate_improvement_suggestions(
+            result.missing_skills,
+            result.weak_skills
+        )
+        return result.model_dump()
+    
+    def clear_caches(self):
+        """Drop cached job description and resume chunk features"""
+        with self._cache_lock:
+            self._chunk_cache.clear()
+            self._job_cache.clear()
+        self.nlp.clear_caches()
     
-    def _get_skill_category(self, skill_name: str, skills_list: List[Dict]) -> str:
-        """Get category for a skill"""
-        for skill in skills_list:
-            if skill['name'].lower() == skill_name.lower():
-                return skill.get('category', 'Other')
-        return 'Other'
+    def _hash(self, text: str) -> str:
+        """Content hash used to compare chunks"""
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
     
-    def _determine_importance(self, skill: str, job_description: str) -> str:
-        """Determine importance of a skill based on job description"""
-        jd_lower = job_description.lower()
-        skill_lower = skill.lower()
-        
-        # Count occurrences
-        count = jd_lower.count(skill_lower)
-        
-        # Check for importance keywords
-        importance_keywords = {
-            'high': ['required', 'must have', 'essential', 'critical', 'mandatory'],
-            'medium': ['preferred', 'should have', 'desired', 'important'],
-            'low': ['nice to have', 'plus', 'bonus', 'optional']
+    def _cache_key(self, text: str) -> str:
+        """Cache key for extracted features, scoped to the loaded skill taxonomy"""
+        return f"{self.nlp.taxonomy_generation}:{self._hash(text)}"
+    
+    def _split_chunks(self, text: str) -> List[str]:
+        """Split a resume into paragraph chunks, folding short headings into the next chunk"""
+        chunks = []
+        carry = ""
+        for block in re.split(r'\n\s*\n', text or ""):
+            block = block.strip()
+            if not block:
+                continue
+            block = f"{carry}\n{block}" if carry else block
+            if len(block) < 120:
+                carry = block
+                continue
+            chunks.append(block)
+            carry = ""
+        if carry:
+            chunks.append(carry)
+        return chunks
+    
+    def _cache_get(self, cache: OrderedDict, key: str) -> Optional[Dict]:
+        """Look up a bounded LRU cache, marking a hit as recently used"""
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, cache: OrderedDict, key: str, value: Dict, limit: int):
+        """Insert into a bounded LRU cache"""
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > limit:
+                cache.popitem(last=False)
+    
+    def _job_features(self, job_description: str) -> Dict:
+        """Skills, experience and embedding for a job description (cached)"""
+        key = self._cache_key(job_description)
+        features = self._cache_get(self._job_cache, key)
+        record_cache("job_features", features is not None)
+        if features is not None:
+            return features
+        
+        embeddings = self.nlp.encode_texts([job_description], "job_description")
+        features = {
+            'skill_set': self.nlp.extract_skill_set(job_description),
+            'embedding': embeddings[0] if embeddings is not None else None
         }
+        self._cache_put(self._job_cache, key, features, self.job_cache_size)
+        return features
+    
+    def _chunk_features(self, chunks: List[str]) -> Tuple[List[Dict], int]:
+        """Skills, experience and embedding per resume chunk, computing only uncached chunks"""
+        keys = [self._cache_key(chunk) for chunk in chunks]
+        features: List[Optional[Dict]] = []
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self._cache_get(self._chunk_cache, key)
+            record_cache("resume_chunks", cached is not None)
+            if cached is None:
+                missing.append(i)
+            features.append(cached)
         
-        # Check context around skill mentions
-        for level, keywords in importance_keywords.items():
-            for keyword in keywords:
-                if keyword in jd_lower:
-                    # Check if skill is mentioned near this keyword
-                    if skill_lower in jd_lower:
-                        return level
-        
-        # Default based on occurrence count
-        if count >= 3:
-            return 'high'
-        elif count >= 2:
-            return 'medium'
-        else:
-            return 'low'
+        # Embed all changed chunks in one batch
+        embeddings = self.nlp.encode_texts([chunks[i] for i in missing], "resume_chunks") if missing else None
+        for n, i in enumerate(missing):
+            features[i] = {
+                'skill_set': self.nlp.extract_skill_set(chunks[i]),
+                'embedding': embeddings[n] if embeddings is not None else None
+            }
+            self._cache_put(self._chunk_cache, keys[i], features[i], self.chunk_cache_size)
+        
+        return features, len(chunks) - len(missing)
     
-    def _identify_weak_skills(
-        self, 
-        resume_text: str, 
-        job_description: str,
-        matched_skills: List[Skill]
-    ) -> List[SkillGap]:
-        """Identify skills that exist but may need improvement"""
+    def _resume_job_similarity(
+        self,
+        chunks: List[str],
+        chunk_features: List[Dict],
+        job_embedding
+    ) -> float:
+        """Cosine similarity between the length-weighted mean chunk embedding and the JD"""
+        vectors = [f['embedding'] for f in chunk_features if f['embedding'] is not None]
+        if job_embedding is None or not vectors or len(vectors) != len(chunks):
+            return 0.0
+        
+        weights = np.array([len(chunk) for chunk in chunks], dtype=float)
+        resume_embedding = np.average(np.vstack(vectors), axis=0, weights=weights)
+        return float(cosine_similarity_numpy(resume_embedding, job_embedding)[0][0])
+    
+    def _identify_weak_skills(self, resume_skills: SkillSet, job_skills: SkillSet) -> List[SkillGap]:
+        """Identify skills that exist but may need improvement
+        
+        Compares stated years of experience for skills present in both sets.
+        """
         weak_skills = []
         
-        # Extract experience information
-        resume_experience = self.nlp.extract_experience_years(resume_text)
-        job_experience = self.nlp.extract_experience_years(job_description)
-        
-        # Compare experience requirements
-        for job_skill, required_years in job_experience.items():
-            for resume_skill, actual_years in resume_experience.items():
-                if (job_skill.lower() in resume_skill.lower() or 
-                    resume_skill.lower() in job_skill.lower()):
-                    if actual_years < required_years:
-                        weak_skills.append(SkillGap(
-                            skill=job_skill.title(),
-                            required_level=min(required_years / 10, 1.0),
-                            current_level=min(actual_years / 10, 1.0),
-                            importance='high'
-                        ))
+        # Join on skill ID and compare experience levels
+        common, job_idx, resume_idx = np.intersect1d(
+            job_skills.ids, resume_skills.ids, assume_unique=True, return_indices=True
+        )
+        required = job_skills.levels[job_idx]
+        actual = resume_skills.levels[resume_idx]
+        weak = (actual > 0) & (actual < required)
+        
+        for skill_id, required_years, actual_years in zip(common[weak], required[weak], actual[weak]):
+            weak_skills.append(SkillGap(
+                skill=self.nlp.vocabulary.display_names[skill_id],
+                required_level=min(float(required_years) / 10, 1.0),
+                current_level=min(float(actual_years) / 10, 1.0),
+                importance='high'
+            ))
         
         return weak_skills
     
@@ -194,32 +334,10 @@ class AnalysisService:
     
     def _generate_learning_path(self, skill: str) -> List[str]:
         """Generate a learning path for a skill"""
-        # This is a simplified version - in production, this could be AI-generated
-        common_paths = {
-            'python': [
-                'Learn Python basics and syntax',
-                'Practice with small projects and exercises',
-                'Study Python libraries relevant to your field',
-                'Build a portfolio project using Python'
-            ],
-            'react': [
-                'Learn JavaScript fundamentals',
-                'Understand React basics: components, props, state',
-                'Learn React hooks and modern patterns',
-                'Build a full React application'
-            ],
-            'machine learning': [
-                'Learn Python and math fundamentals',
-                'Study ML algorithms and concepts',
-                'Practice with scikit-learn and datasets',
-                'Work on ML projects and participate in competitions'
-            ]
-        }
-        
-        # Check for specific skill paths
-        for key, path in common_paths.items():
-            if key in skill:
-                return path
+        # Curated paths come from the skill taxonomy
+        path = self.nlp.taxonomy.learning_paths.get(skill)
+        if path:
+            return path
         
         # Generic learning path
         return [
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.models import UserAnalysis
+from app.services.document_store import document_store
+from app.services.metrics import analysis_write_queue, analysis_flush_duration, analysis_writes
+
+
+class AnalysisWriter:
+    """Write-behind buffer that persists analyses with batched insert_many
+
+    Queued analyses get their ID up front so callers can return it right
+    away, and stay readable through get_pending() until they are written.
+    Each flush first stores the resume and job description texts staged
+    in the document store, so an analysis never references a missing text.
+    The buffer flushes when it holds batch_size analyses or every
+    flush_interval seconds. When it reaches max_queue (Mongo is slow or
+    down), enqueue() waits for a flush, pushing back on new requests; if
+    writes keep failing the oldest analyses are dropped rather than
+    growing without bound.
+    """
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 1.0, max_queue: int = 1000):
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.max_queue = max(max_queue, self.batch_size)
+        self._queue: "OrderedDict[PydanticObjectId, UserAnalysis]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.dropped = 0  # Analyses discarded unsaved because the queue was full
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def enqueue(self, analysis: UserAnalysis) -> PydanticObjectId:
+        """Queue an analysis for writing and return its ID"""
+        if len(self._queue) >= self.max_queue:
+            analysis_writes.inc(result="backpressure")
+            await self.flush()
+            # Still full means writes are failing; keep memory bounded
+            dropped = []
+            while len(self._queue) >= self.max_queue:
+                dropped.append(self._queue.popitem(last=False)[1])
+            if dropped:
+                self._unstage_texts(dropped)
+                self.dropped += len(dropped)
+                analysis_writes.inc(len(dropped), result="dropped")
+                print(
+                    f"WARNING: analysis write queue full and writes failing, dropped {len(dropped)} "
+                    f"unsaved analyses ({self.dropped} since start): "
+                    f"{', '.join(str(analysis.id) for analysis in dropped)}"
+                )
+
+        if analysis.id is None:
+            analysis.id = PydanticObjectId()
+        self._queue[analysis.id] = analysis
+        analysis_write_queue.set(len(self._queue))
+
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return analysis.id
+
+    @staticmethod
+    def _text_keys(analysis: UserAnalysis) -> set:
+        keys = set()
+        if analysis.resume_hash:
+            keys.add(("resume", analysis.resume_hash))
+        if analysis.job_description_hash:
+            keys.add(("job_description", analysis.job_description_hash))
+        return keys
+
+    def _unstage_texts(self, dropped: List[UserAnalysis]):
+        """Release the dropped analyses' references to texts staged for the next flush"""
+        for analysis in dropped:
+            for kind, digest in self._text_keys(analysis):
+                document_store.unstage(kind, digest)
+
+    def get_pending(self, analysis_id: PydanticObjectId) -> Optional[UserAnalysis]:
+        """A queued analysis that hasn't been written yet"""
+        return self._queue.get(analysis_id)
+
+    async def load(self, analysis_id: PydanticObjectId) -> Optional[UserAnalysis]:
+        """Load an analysis, including one still waiting in the buffer"""
+        return self.get_pending(analysis_id) or await UserAnalysis.get(analysis_id)
+
+    async def flush(self):
+        """Write queued analyses in batches"""
+        async with self._flush_lock:
+            while self._queue:
+                batch = list(self._queue.values())[:self.batch_size]
+                failed = await self._write(batch)
+                for analysis in batch:
+                    if analysis.id not in failed:
+                        self._queue.pop(analysis.id, None)
+                analysis_write_queue.set(len(self._queue))
+                if failed:
+                    # Leave the rest queued and retry on the next flush
+                    break
+
+    async def _write(self, batch: List[UserAnalysis]) -> set:
+        """Insert a batch, returning the IDs that should be retried"""
+        start = time.perf_counter()
+        try:
+            await document_store.write_staged()
+            await UserAnalysis.insert_many(batch, ordered=False)
+            analysis_writes.inc(len(batch), result="written")
+            return set()
+        except BulkWriteError as e:
+            # Duplicate keys mean an earlier attempt already wrote the document
+            retry = {
+                batch[error["index"]].id
+                for error in e.details.get("writeErrors", [])
+                if error.get("code") != 11000
+            }
+            analysis_writes.inc(len(batch) - len(retry), result="written")
+            analysis_writes.inc(len(retry), result="retried")
+            print(f"Error writing analyses, retrying {len(retry)}: {e}")
+            return retry
+        except Exception as e:
+            analysis_writes.inc(len(batch), result="retried")
+            print(f"Error writing analyses, retrying {len(batch)}: {e}")
+            return {analysis.id for analysis in batch}
+        finally:
+            analysis_flush_duration.observe(time.perf_counter() - start)
+
+    async def _flush_loop(self):
+        """Flush when a batch fills up or the interval passes"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._queue:
+                await self.flush()
+
+    def start(self):
+        """Start the background flush task"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the background flush task and write remaining analyses"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+# Singleton instance
+analysis_writer = AnalysisWriter(
+    batch_size=settings.analysis_write_batch_size,
+    flush_interval=settings.analysis_flush_interval,
+    max_queue=settings.analysis_write_max_queue
+)
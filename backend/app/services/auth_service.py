@@ -1,23 +1,44 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 import os
+from app.config import settings
+from app.services.metrics import run_in_executor
 
 
 class TokenData(BaseModel):
     """Token data model"""
     user_id: Optional[str] = None
     email: Optional[str] = None
+    expires_at: Optional[int] = None  # Unix timestamp from the "exp" claim
 
 
 class AuthService:
     """Authentication service for JWT tokens and password hashing"""
     
     def __init__(self):
-        # Password hashing
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # Password hashing. Pinning min/max rounds to the configured cost makes
+        # hashes with any other cost "need update", so they are redone on login.
+        rounds = settings.password_hash_rounds
+        self.pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds
+        )
+        
+        # bcrypt is CPU-bound for 100+ ms per call, so it runs off the event loop
+        # in its own small pool; the semaphore makes extra callers wait on the loop
+        # instead of piling up in the executor queue
+        self._hash_executor = ThreadPoolExecutor(
+            max_workers=max(settings.password_hash_workers, 1), thread_name_prefix="password-hash"
+        )
+        self._hash_slots = asyncio.Semaphore(max(settings.password_hash_workers, 1))
         
         # JWT settings - Load from environment or use secure default
         self.SECRET_KEY = os.getenv(
@@ -37,6 +58,22 @@ class AuthService:
         """Hash a password"""
         return self.pwd_context.hash(password)
     
+    async def _run_hash(self, fn, *args):
+        async with self._hash_slots:
+            return await run_in_executor("password_hash", fn, *args, executor=self._hash_executor)
+    
+    async def hash_password(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run_hash(self.get_password_hash, password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password without blocking the event loop
+        
+        Returns whether it matched and, if the stored hash uses an outdated
+        cost, a new hash to save in its place.
+        """
+        return await self._run_hash(self.pwd_context.verify_and_update, plain_password, hashed_password)
+    
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
         to_encode = data.copy()
@@ -60,7 +97,7 @@ class AuthService:
             if user_id is None:
                 return None
             
-            return TokenData(user_id=user_id, email=email)
+            return TokenData(user_id=user_id, email=email, expires_at=payload.get("exp"))
         except JWTError:
             return None
 
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from app.config import settings
+from app.models import ChatSession
+from app.services.metrics import record_cache
+
+
+SessionKey = Tuple[str, str]
+
+
+class _SessionEntry:
+    """Cached chat session held in memory"""
+
+    __slots__ = ("messages", "loaded_at", "unsaved", "cleared")
+
+    def __init__(self, messages: List[Dict], limit: int):
+        # Ring buffer - appending past the limit drops the oldest message
+        self.messages: Deque[Dict] = deque(messages, maxlen=limit)
+        self.loaded_at = time.monotonic()
+        # Writes not yet persisted: messages appended since the last flush,
+        # and whether the stored history must be replaced rather than extended
+        self.unsaved: List[Dict] = []
+        self.cleared = False
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.unsaved) or self.cleared
+
+    def take_writes(self) -> Tuple[bool, List[Dict]]:
+        """Hand the unsaved writes to a flush"""
+        writes = (self.cleared, self.unsaved)
+        self.cleared, self.unsaved = False, []
+        return writes
+
+    def restore_writes(self, cleared: bool, unsaved: List[Dict]):
+        """Put back writes whose flush failed, ahead of any made since"""
+        if self.cleared:
+            return  # Cleared again meanwhile; the failed writes are obsolete
+        self.cleared = cleared
+        self.unsaved = unsaved + self.unsaved
+
+
+class ChatSessionStore:
+    """User-scoped chat session store with LRU caching and write-behind persistence"""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        history_limit: int = 20,
+        ttl: float = 30,
+        flush_interval: float = 2.0
+    ):
+        self.max_sessions = max_sessions
+        self.history_limit = history_limit
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+
+        self._sessions: "OrderedDict[SessionKey, _SessionEntry]" = OrderedDict()
+        # Dirty sessions evicted before they were flushed
+        self._pending: Dict[SessionKey, _SessionEntry] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def get_history(self, user_id: str, session_id: str) -> List[Dict]:
+        """Get chat history for a session"""
+        entry = await self._get_entry((user_id, session_id))
+        return list(entry.messages)
+
+    async def append(self, user_id: str, session_id: str, *messages: Dict):
+        """Append messages to a session"""
+        entry = await self._get_entry((user_id, session_id))
+        entry.messages.extend(messages)
+        entry.unsaved.extend(messages)
+
+    async def clear(self, user_id: str, session_id: str):
+        """Clear all messages in a session"""
+        entry = await self._get_entry((user_id, session_id))
+        entry.messages.clear()
+        entry.unsaved = []
+        entry.cleared = True
+
+    async def _get_entry(self, key: SessionKey) -> _SessionEntry:
+        """Get a cached session, loading it from the database when needed"""
+        entry = self._sessions.get(key)
+
+        # Reload idle clean sessions so other workers' writes become visible
+        if entry is not None and not entry.dirty and time.monotonic() - entry.loaded_at > self.ttl:
+            entry = None
+
+        record_cache("chat_sessions", entry is not None)
+        if entry is None:
+            if key in self._pending:
+                # Evicted before it was flushed - take the unsaved copy back
+                entry = self._pending.pop(key)
+                self._sessions[key] = entry
+            else:
+                messages = await self._load(key)
+                # Another request may have populated the cache while we were loading
+                entry = self._sessions.get(key)
+                if entry is None or not entry.dirty:
+                    entry = _SessionEntry(messages, self.history_limit)
+                    self._sessions[key] = entry
+
+        self._sessions.move_to_end(key)
+        self._evict()
+        return entry
+
+    async def _load(self, key: SessionKey) -> List[Dict]:
+        """Load session messages from the database"""
+        user_id, session_id = key
+        try:
+            session = await ChatSession.find_one(
+                ChatSession.user_id == user_id,
+                ChatSession.session_id == session_id
+            )
+            return session.messages if session else []
+        except Exception as e:
+            print(f"Error loading chat session: {e}")
+            return []
+
+    def _evict(self):
+        """Evict least recently used sessions beyond the limit"""
+        while len(self._sessions) > self.max_sessions:
+            key, entry = self._sessions.popitem(last=False)
+            if entry.dirty:
+                self._pending[key] = entry
+
+    async def flush(self):
+        """Persist the writes of all dirty and evicted sessions"""
+        evicted = self._pending
+        self._pending = {}
+        writes = {key: entry.take_writes() for key, entry in evicted.items()}
+        for key, entry in self._sessions.items():
+            if entry.dirty:
+                writes[key] = entry.take_writes()
+
+        for key, (cleared, messages) in writes.items():
+            try:
+                await self._persist(key, cleared, messages)
+            except Exception as e:
+                print(f"Error persisting chat session: {e}")
+                entry = self._sessions.get(key) or self._pending.get(key) or evicted.get(key)
+                if entry is not None:
+                    entry.restore_writes(cleared, messages)
+                    if key not in self._sessions:
+                        self._pending[key] = entry
+
+    async def _persist(self, key: SessionKey, cleared: bool, messages: List[Dict]):
+        """Apply a session's writes to its document
+        
+        Appends are pushed onto the stored list (trimmed to the history
+        limit) so concurrent flushes from several workers don't overwrite
+        each other's messages. Only a clear replaces the list.
+        """
+        user_id, session_id = key
+        now = datetime.utcnow()
+        if cleared:
+            update = {"$set": {"messages": messages, "updated_at": now}}
+        else:
+            update = {
+                "$push": {"messages": {"$each": messages, "$slice": -self.history_limit}},
+                "$set": {"updated_at": now}
+            }
+        update["$setOnInsert"] = {"created_at": now}
+        await ChatSession.get_motor_collection().update_one(
+            {"user_id": user_id, "session_id": session_id},
+            update,
+            upsert=True
+        )
+
+    async def _flush_loop(self):
+        """Periodically flush dirty sessions"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        """Start the background flush task"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the background flush task and flush remaining writes"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+# Singleton instance
+chat_session_store = ChatSessionStore(
+    max_sessions=settings.chat_max_sessions,
+    history_limit=settings.chat_history_limit,
+    ttl=settings.chat_session_ttl,
+    flush_interval=settings.chat_flush_interval
+)
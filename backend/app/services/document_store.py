@@ -0,0 +1,200 @@
+import zlib
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.config import settings
+from app.models import StoredText, ResumeDocument, JobDescriptionDocument, UserAnalysis
+from app.services.metrics import record_cache
+
+
+class DocumentStore:
+    """Content-addressed storage for resume and job description texts
+
+    Each distinct text is written once, keyed by its SHA-256 hash, so a job
+    description shared by many candidates (or a resume sent to many
+    postings) costs one document. Texts above a size threshold are
+    zlib-compressed. Recently used hashes and texts are cached per worker.
+    
+    stage() hashes a text without touching the database; staged texts are
+    readable through get() and written by the next write_staged(). At most
+    staged_size texts are held; beyond that the oldest are discarded.
+    """
+
+    KINDS: Dict[str, Type[StoredText]] = {
+        "resume": ResumeDocument,
+        "job_description": JobDescriptionDocument,
+    }
+
+    def __init__(self, cache_size: int = 256, known_size: int = 4096, staged_size: int = 2000):
+        self.cache_size = cache_size
+        self.known_size = known_size
+        self.staged_size = max(staged_size, 1)
+        self._texts: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._known: "OrderedDict[Tuple[str, str], None]" = OrderedDict()  # Hashes already stored
+        # Texts waiting for write_staged(), with how many queued analyses reference each
+        self._staged: "OrderedDict[Tuple[str, str], List]" = OrderedDict()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _encode(self, text: str) -> Tuple[bytes, str]:
+        data = text.encode('utf-8')
+        if settings.document_compression and len(data) >= settings.document_compression_min_bytes:
+            return zlib.compress(data, 6), "zlib"
+        return data, "utf-8"
+
+    @staticmethod
+    def _decode(content: bytes, encoding: str) -> str:
+        if encoding == "zlib":
+            content = zlib.decompress(content)
+        return content.decode('utf-8')
+
+    def _remember(self, cache: OrderedDict, key, value, limit: int):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+    async def put(self, kind: str, text: str) -> str:
+        """Store a text if it isn't stored yet and return its hash"""
+        digest = self.hash_text(text)
+        key = (kind, digest)
+        known = key in self._known
+        record_cache("stored_documents", known)
+        if known:
+            self._known.move_to_end(key)
+            return digest
+
+        await self._store(kind, digest, text)
+        return digest
+
+    def stage(self, kind: str, text: str) -> str:
+        """Return a text's hash now and store the text on the next write_staged()"""
+        digest = self.hash_text(text)
+        key = (kind, digest)
+        known = key in self._known
+        record_cache("stored_documents", known)
+        if known:
+            self._known.move_to_end(key)
+            return digest
+
+        entry = self._staged.setdefault(key, [text, 0])
+        entry[1] += 1
+        self._staged.move_to_end(key)
+        if len(self._staged) > self.staged_size:
+            discarded = 0
+            while len(self._staged) > self.staged_size:
+                self._staged.popitem(last=False)
+                discarded += 1
+            print(f"WARNING: document staging full, discarded {discarded} unsaved texts")
+        return digest
+
+    def unstage(self, kind: str, digest: str):
+        """Release one reference to a staged text, forgetting it when none are left"""
+        key = (kind, digest)
+        entry = self._staged.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._staged[key]
+
+    async def write_staged(self):
+        """Store staged texts with one unordered bulk upsert per kind
+
+        A text whose write fails stays staged for the next call. Raises if
+        any write failed other than on a duplicate key.
+        """
+        by_kind: Dict[str, List[Tuple[str, str]]] = {}
+        for (kind, digest), (text, _) in list(self._staged.items()):
+            by_kind.setdefault(kind, []).append((digest, text))
+
+        error = None
+        for kind, texts in by_kind.items():
+            failed = set()
+            try:
+                await self.KINDS[kind].get_motor_collection().bulk_write(
+                    [UpdateOne({"_id": digest}, self._insert_fields(text), upsert=True) for digest, text in texts],
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                # Duplicate keys mean a concurrent upsert already stored the content
+                failed = {
+                    write_error["index"]
+                    for write_error in e.details.get("writeErrors", [])
+                    if write_error.get("code") != 11000
+                }
+                if failed:
+                    error = e
+            except Exception as e:
+                failed = set(range(len(texts)))
+                error = e
+
+            for i, (digest, text) in enumerate(texts):
+                if i not in failed:
+                    self._staged.pop((kind, digest), None)
+                    self._stored(kind, digest, text)
+
+        if error is not None:
+            raise error
+
+    def _insert_fields(self, text: str) -> Dict:
+        """Update document that writes a text only if its hash isn't stored yet"""
+        content, encoding = self._encode(text)
+        return {"$setOnInsert": {
+            "content": content,
+            "encoding": encoding,
+            "length": len(text),
+            "created_at": datetime.utcnow()
+        }}
+
+    async def _store(self, kind: str, digest: str, text: str):
+        try:
+            await self.KINDS[kind].get_motor_collection().update_one(
+                {"_id": digest}, self._insert_fields(text), upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # Concurrent upsert of the same content already stored it
+        self._stored(kind, digest, text)
+
+    def _stored(self, kind: str, digest: str, text: str):
+        key = (kind, digest)
+        self._remember(self._known, key, None, self.known_size)
+        self._remember(self._texts, key, text, self.cache_size)
+
+    async def get(self, kind: str, digest: str) -> Optional[str]:
+        """Load a text by hash"""
+        key = (kind, digest)
+        text = self._texts.get(key)
+        record_cache("document_texts", text is not None or key in self._staged)
+        if text is not None:
+            self._texts.move_to_end(key)
+            return text
+        if key in self._staged:
+            return self._staged[key][0]
+
+        document = await self.KINDS[kind].get(digest)
+        if document is None:
+            return None
+        text = self._decode(document.content, document.encoding)
+        self._remember(self._texts, key, text, self.cache_size)
+        self._remember(self._known, key, None, self.known_size)
+        return text
+
+    async def texts_for(self, analysis: UserAnalysis) -> Tuple[Optional[str], Optional[str]]:
+        """Resume and job description texts of an analysis, stored inline or by reference"""
+        resume_text = analysis.resume_text
+        if resume_text is None and analysis.resume_hash:
+            resume_text = await self.get("resume", analysis.resume_hash)
+        job_description = analysis.job_description
+        if job_description is None and analysis.job_description_hash:
+            job_description = await self.get("job_description", analysis.job_description_hash)
+        return resume_text, job_description
+
+
+# Singleton instance
+document_store = DocumentStore(staged_size=2 * settings.analysis_write_max_queue)
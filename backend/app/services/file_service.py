@@ -5,6 +5,7 @@ from fastapi import UploadFile
 import PyPDF2
 import pdfplumber
 from docx import Document
+from app.services.tracing import span
 
 
 class FileService:
@@ -30,14 +31,15 @@ class FileService:
         ext = ext.lower()
         
         try:
-            if ext == '.pdf':
-                return await self._extract_from_pdf(file_path)
-            elif ext == '.docx':
-                return await self._extract_from_docx(file_path)
-            elif ext == '.txt':
-                return await self._extract_from_txt(file_path)
-            else:
-                raise ValueError(f"Unsupported file format: {ext}")
+            with span("file.extract"):
+                if ext == '.pdf':
+                    return await self._extract_from_pdf(file_path)
+                elif ext == '.docx':
+                    return await self._extract_from_docx(file_path)
+                elif ext == '.txt':
+                    return await self._extract_from_txt(file_path)
+                else:
+                    raise ValueError(f"Unsupported file format: {ext}")
         except Exception as e:
             print(f"Error extracting text from {file_path}: {e}")
             raise
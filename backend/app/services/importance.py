@@ -0,0 +1,125 @@
+import re
+from typing import Dict, List, Optional
+from app.services.skill_taxonomy import SkillTaxonomy
+
+
+# Phrases signalling how important nearby requirements are
+IMPORTANCE_KEYWORDS = {
+    'high': ['required', 'requirements', 'must have', 'must', 'essential', 'critical', 'mandatory'],
+    'medium': ['preferred', 'should have', 'desired', 'important'],
+    'low': ['nice to have', 'plus', 'bonus', 'optional']
+}
+LEVEL_RANK = {'low': 1, 'medium': 2, 'high': 3}
+
+KEYWORD_LEVELS = {
+    keyword: level
+    for level, keywords in IMPORTANCE_KEYWORDS.items()
+    for keyword in keywords
+}
+
+# Bulleted or numbered list items, which are headings only if they end with ':'
+BULLET = re.compile(r'^(?:[\-*•▪●>]|\d+[.)])\s*')
+# Longest headings treated as section titles ("TECHNICAL STACK YOU'LL USE")
+HEADING_MAX_WORDS = 6
+
+
+def _alternation(terms) -> str:
+    # Longest first so multi-word terms win over their prefixes
+    return '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+
+
+KEYWORD_PATTERN = re.compile(r'(?<![a-z0-9])(?:' + _alternation(KEYWORD_LEVELS) + r')(?![a-z0-9])')
+# A line built around an importance phrase, with up to two qualifier words
+# before it ("Requirements", "## Highly preferred qualifications", "Really nice to have")
+BARE_HEADING = re.compile(
+    r'^[#\s]*(?:[a-z]+\s+){0,2}(?:' + _alternation(KEYWORD_LEVELS) + r')'
+    r'(?:\s+(?:skills|qualifications|experience|requirements))?[\s:.!]*$'
+)
+
+
+def is_heading(line: str) -> bool:
+    """Whether a stripped line is a section heading
+
+    Headings end with ':' ("Nice to have:"), are a bare importance phrase
+    ("Preferred qualifications"), or are short upper-case titles
+    ("TECHNICAL STACK YOU'LL USE"). Other list items never are.
+    """
+    if line.endswith(':'):
+        return True
+    if BULLET.match(line):
+        return False
+    if BARE_HEADING.match(line.lower()):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    if not letters or len(line.split()) > HEADING_MAX_WORDS:
+        return False
+    return sum(c.isupper() for c in letters) >= 0.8 * len(letters)
+
+
+def heading_level(line: str) -> Optional[str]:
+    """Importance level a heading sets for the lines below it, None if it names none"""
+    levels = [KEYWORD_LEVELS[m.group(0)] for m in KEYWORD_PATTERN.finditer(line.lower())]
+    return max(levels, key=LEVEL_RANK.get) if levels else None
+
+
+def score_importance(skills: List[str], job_description: str, taxonomy: SkillTaxonomy) -> Dict[str, str]:
+    """Determine importance of every skill in a single pass over the job description
+
+    Mentions are found with the taxonomy matcher, so aliases and spelling
+    variants ("Postgres", "k8s", "Node JS") count for their skill. Each
+    mention takes the level of the nearest importance keyword in the same
+    sentence, or else of the section heading it sits under (e.g. "Nice to
+    have:"). A heading without an importance keyword ("ABOUT US") ends the
+    previous section. A skill gets the highest level among its mentions;
+    skills never mentioned near a keyword fall back to their mention count.
+    """
+    if not skills:
+        return {}
+
+    skill_keys = {skill: taxonomy.canonicalize(skill) or skill.lower() for skill in skills}
+    wanted = set(skill_keys.values())
+
+    best_rank: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    section_level = None
+
+    for raw_line in job_description.split('\n'):
+        raw_line = raw_line.strip()
+        if not raw_line:
+            continue
+        line = raw_line.lower()
+
+        # Headings set the level for the lines below; other short lines
+        # ("- Strong communication") stay in the current section
+        if is_heading(raw_line):
+            section_level = heading_level(line)
+
+        for sentence in re.split(r'(?<=[.!?;])\s+', line):
+            mentions = [(pos, skill) for pos, skill in taxonomy.find_mentions(sentence) if skill in wanted]
+            if not mentions:
+                continue
+            keywords = [
+                (match.start(), KEYWORD_LEVELS[match.group(0)])
+                for match in KEYWORD_PATTERN.finditer(sentence)
+            ]
+
+            for pos, skill in mentions:
+                counts[skill] = counts.get(skill, 0) + 1
+                if keywords:
+                    level = min(keywords, key=lambda k: abs(k[0] - pos))[1]
+                else:
+                    level = section_level
+                if level:
+                    best_rank[skill] = max(best_rank.get(skill, 0), LEVEL_RANK[level])
+
+    rank_levels = {rank: level for level, rank in LEVEL_RANK.items()}
+    importance = {}
+    for skill, key in skill_keys.items():
+        if key in best_rank:
+            importance[skill] = rank_levels[best_rank[key]]
+        else:
+            # Default based on occurrence count
+            count = counts.get(key, 0)
+            importance[skill] = 'high' if count >= 3 else 'medium' if count >= 2 else 'low'
+
+    return importance
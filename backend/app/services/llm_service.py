@@ -1,6 +1,15 @@
 import os
-from typing import Optional, List, Dict
+import re
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple
 from app.config import settings
+from app.services.prompt_builder import PromptBuilder
+from app.services.metrics import llm_call_duration, llm_prompt_tokens, llm_requests, record_cache, run_in_executor
+from app.services.tracing import span
+from app.services.resilience import TokenBucket, CircuitBreaker, LLMUnavailableError
 
 
 class LLMService:
@@ -9,7 +18,26 @@ class LLMService:
     def __init__(self):
         self.use_gemini = settings.use_gemini
         self.client = None
+        # Per-skill roadmap cache keyed by (skill, current_level, target_level, timeframe)
+        self._roadmap_cache: "OrderedDict[Tuple[str, str, str, str], Dict]" = OrderedDict()
+        # Per-operation call and fallback counters
+        self.call_stats: Dict[str, Dict[str, int]] = {}
         self._initialize_client()
+        
+        # Provider protection: rate limiting and circuit breaking per provider
+        self.rate_limiters: Dict[str, TokenBucket] = {}
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        for provider in ("gemini", "openai"):
+            self.rate_limiters[provider] = TokenBucket(
+                settings.llm_rate_limit_per_minute,
+                settings.llm_rate_limit_burst
+            )
+            self.circuit_breakers[provider] = CircuitBreaker(
+                window=settings.llm_breaker_window,
+                failure_ratio=settings.llm_breaker_failure_ratio,
+                slow_call_seconds=settings.llm_slow_call_seconds,
+                cooldown=settings.llm_breaker_cooldown
+            )
     
     def _initialize_client(self):
         """Initialize LLM client"""
@@ -21,7 +49,7 @@ class LLMService:
                 print("Gemini LLM initialized")
             elif settings.openai_api_key:
                 from openai import OpenAI
-                self.client = OpenAI(api_key=settings.openai_api_key)
+                self.client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
                 print("OpenAI LLM initialized")
             else:
                 print("Warning: No LLM API key configured. Using fallback responses.")
@@ -29,33 +57,32 @@ class LLMService:
             print(f"Error initializing LLM: {e}")
             self.client = None
     
-    async def generate_resume_rewrite_suggestions(
-        self, 
-        resume_text: str, 
-        job_description: str,
-        missing_skills: List[str]
-    ) -> str:
-        """Generate resume rewrite suggestions (optimized for speed)"""
+    async def generate_resume_rewrite_suggestions(self, missing_skills: List[str]) -> str:
+        """Generate resume rewrite suggestions for the top missing skills (optimized for speed)"""
         if not self.client:
+            self._track("resume_suggestions", fallback=True)
             return self._fallback_resume_suggestions(missing_skills)
         
         # Shortened prompt for faster processing
-        prompt = f"""As a resume expert, provide 3 specific tips to improve this resume for the job.
+        builder = PromptBuilder("resume_suggestions")
+        builder.add("instructions", f"""As a resume expert, provide 3 specific tips to improve this resume for the job.
 
-Missing Skills: {', '.join(missing_skills[:3])}
-
-Tips:
+Missing Skills: {', '.join(missing_skills[:3])}""")
+        builder.add("format", """Tips:
 1. How to highlight relevant experience
 2. Keywords to add
 3. Skills section improvements
 
-Be brief and actionable."""
+Be brief and actionable.""")
+        prompt = self._build_prompt(builder)
 
         try:
             response = await self._call_llm(prompt)
+            self._track("resume_suggestions")
             return response
         except Exception as e:
             print(f"Error generating resume suggestions: {e}")
+            self._track("resume_suggestions", fallback=True)
             return self._fallback_resume_suggestions(missing_skills)
     
     async def generate_learning_roadmap(
@@ -67,9 +94,17 @@ Be brief and actionable."""
     ) -> Dict[str, any]:
         """Generate personalized learning roadmap for a skill"""
         if not self.client:
+            self._track("learning_roadmap", fallback=True)
             return self._fallback_learning_roadmap(skill)
         
-        prompt = f"""Create a detailed learning roadmap for someone who wants to learn {skill}.
+        cache_key = self._roadmap_key(skill, current_level, target_level, timeframe)
+        record_cache("roadmap", cache_key in self._roadmap_cache)
+        if cache_key in self._roadmap_cache:
+            self._roadmap_cache.move_to_end(cache_key)
+            return self._roadmap_cache[cache_key]
+        
+        builder = PromptBuilder("learning_roadmap")
+        builder.add("instructions", f"""Create a detailed learning roadmap for someone who wants to learn {skill}.
 
 Current Level: {current_level}
 Target Level: {target_level}
@@ -82,19 +117,154 @@ Provide a structured learning path with:
 4. Resources and tools to use
 5. Milestones to track progress
 
-Format as a clear, actionable plan."""
+Format as a clear, actionable plan.""")
+        prompt = self._build_prompt(builder)
 
         try:
             response = await self._call_llm(prompt)
-            return {
+            roadmap = {
                 'skill': skill,
                 'roadmap': response,
                 'timeframe': timeframe
             }
+            self._cache_roadmap(cache_key, roadmap)
+            self._track("learning_roadmap")
+            return roadmap
         except Exception as e:
             print(f"Error generating learning roadmap: {e}")
+            self._track("learning_roadmap", fallback=True)
             return self._fallback_learning_roadmap(skill)
     
+    async def generate_learning_roadmaps(
+        self,
+        skills: List[str],
+        current_level: str,
+        target_level: str,
+        timeframe: str
+    ) -> Dict[str, Dict[str, any]]:
+        """Generate learning roadmaps for several skills, batching LLM round trips"""
+        roadmaps: Dict[str, Dict[str, any]] = {}
+        uncached: List[str] = []
+        
+        for skill in dict.fromkeys(skills):  # Deduplicate, keep order
+            cached = self._roadmap_cache.get(self._roadmap_key(skill, current_level, target_level, timeframe))
+            record_cache("roadmap", cached is not None)
+            if cached:
+                roadmaps[skill] = cached
+            else:
+                uncached.append(skill)
+        
+        if not uncached:
+            return roadmaps
+        if not self.client:
+            self._track("learning_roadmap_batch", fallback=True)
+            roadmaps.update({skill: self._fallback_learning_roadmap(skill) for skill in uncached})
+            return roadmaps
+        
+        # Shrink batches so every roadmap in one still fits the completion budget
+        batch_size = max(min(
+            settings.roadmap_batch_size,
+            settings.llm_max_output_tokens // max(settings.roadmap_tokens_per_skill, 1)
+        ), 1)
+        for i in range(0, len(uncached), batch_size):
+            batch = uncached[i:i + batch_size]
+            roadmaps.update(
+                await self._generate_roadmap_batch(batch, current_level, target_level, timeframe)
+            )
+        
+        return {skill: roadmaps[skill] for skill in dict.fromkeys(skills)}
+    
+    async def _generate_roadmap_batch(
+        self,
+        skills: List[str],
+        current_level: str,
+        target_level: str,
+        timeframe: str
+    ) -> Dict[str, Dict[str, any]]:
+        """Generate roadmaps for a batch of skills in a single LLM call"""
+        if len(skills) == 1:
+            return {skills[0]: await self.generate_learning_roadmap(skills[0], current_level, target_level, timeframe)}
+        
+        builder = PromptBuilder("learning_roadmap_batch")
+        builder.add("instructions", f"""Create a learning roadmap for each of these skills: {', '.join(skills)}
+
+Current Level: {current_level}
+Target Level: {target_level}
+Timeframe: {timeframe}
+
+For each skill provide a week-by-week breakdown, topics to cover, practical projects,
+resources and tools, and milestones to track progress.
+
+Respond ONLY with a JSON object mapping each skill name exactly as given to its roadmap
+as a single plain-text string, for example: {{"{skills[0]}": "Week 1-2: ..."}}""")
+        prompt = self._build_prompt(builder)
+        
+        try:
+            # Each roadmap gets its own share of the output, or the JSON gets cut off
+            response = await self._call_llm(
+                prompt,
+                max_output_tokens=settings.roadmap_tokens_per_skill * len(skills) + 100
+            )
+            parsed = self._parse_roadmap_batch(response, skills)
+            self._track("learning_roadmap_batch", fallback=len(parsed) < len(skills))
+        except LLMUnavailableError as e:
+            # Provider is unhealthy - don't retry skill by skill
+            print(f"Error generating batched learning roadmaps: {e}")
+            self._track("learning_roadmap_batch", fallback=True)
+            return {skill: self._fallback_learning_roadmap(skill) for skill in skills}
+        except Exception as e:
+            print(f"Error generating batched learning roadmaps: {e}")
+            self._track("learning_roadmap_batch", fallback=True)
+            parsed = {}
+        
+        roadmaps = {}
+        for skill in skills:
+            if skill in parsed:
+                roadmaps[skill] = {
+                    'skill': skill,
+                    'roadmap': parsed[skill],
+                    'timeframe': timeframe
+                }
+                self._cache_roadmap(self._roadmap_key(skill, current_level, target_level, timeframe), roadmaps[skill])
+            else:
+                # Fall back to an individual call for skills the batch did not cover
+                roadmaps[skill] = await self.generate_learning_roadmap(skill, current_level, target_level, timeframe)
+        
+        return roadmaps
+    
+    def _parse_roadmap_batch(self, response: str, skills: List[str]) -> Dict[str, str]:
+        """Parse a batched roadmap JSON response into a per-skill dict"""
+        match = re.search(r'\{.*\}', response or "", re.DOTALL)
+        if not match:
+            return {}
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        
+        by_lower = {str(key).strip().lower(): value for key, value in data.items()}
+        parsed = {}
+        for skill in skills:
+            value = by_lower.get(skill.lower())
+            if isinstance(value, list):
+                value = "\n".join(str(v) for v in value)
+            if isinstance(value, str) and value.strip():
+                parsed[skill] = value.strip()
+        return parsed
+    
+    def _roadmap_key(self, skill: str, current_level: str, target_level: str, timeframe: str) -> Tuple[str, str, str, str]:
+        """Cache key for a skill roadmap"""
+        return (skill.strip().lower(), current_level.lower(), target_level.lower(), timeframe.lower())
+    
+    def _cache_roadmap(self, key: Tuple[str, str, str, str], roadmap: Dict[str, any]):
+        """Store a roadmap in the bounded LRU cache"""
+        self._roadmap_cache[key] = roadmap
+        self._roadmap_cache.move_to_end(key)
+        while len(self._roadmap_cache) > settings.roadmap_cache_size:
+            self._roadmap_cache.popitem(last=False)
+    
     async def chat_response(
         self, 
         user_message: str, 
@@ -103,42 +273,35 @@ Format as a clear, actionable plan."""
     ) -> str:
         """Generate chat response for upskilling advice"""
         if not self.client:
+            self._track("chat", fallback=True)
             return self._fallback_chat_response(user_message)
         
+        builder = PromptBuilder("chat")
+        builder.add("instructions", """You are an AI career coach specializing in skill development and career growth.
+Help the user with personalized advice about upskilling, career transitions, and learning strategies.""")
+        
         # Build context from analysis if available
-        context_text = ""
         if context:
-            context_text = f"""
-User's Profile Context:
+            builder.add("context", f"""User's Profile Context:
 - Skill Match: {context.get('skill_match_percentage', 'N/A')}%
 - Missing Skills: {', '.join(context.get('missing_skills', [])[:5])}
-- Career Goal: {context.get('job_title', 'Not specified')}
-"""
+- Career Goal: {context.get('job_title', 'Not specified')}""", priority=1)
         
-        # Build chat history
-        history_text = ""
-        if chat_history:
-            history_text = "\n".join([
-                f"{msg['role']}: {msg['content']}" 
-                for msg in chat_history[-5:]  # Last 5 messages
-            ])
+        # Chat history - oldest turns are dropped first when over budget
+        builder.add_history(chat_history, priority=2)
         
-        prompt = f"""You are an AI career coach specializing in skill development and career growth.
-Help the user with personalized advice about upskilling, career transitions, and learning strategies.
-
-{context_text}
+        builder.add("message", f"""User: {user_message}
 
-{history_text}
-
-User: {user_message}
-
-Provide helpful, encouraging, and actionable advice. Be specific and practical."""
+Provide helpful, encouraging, and actionable advice. Be specific and practical.""")
+        prompt = self._build_prompt(builder)
 
         try:
             response = await self._call_llm(prompt)
+            self._track("chat")
             return response
         except Exception as e:
             print(f"Error generating chat response: {e}")
+            self._track("chat", fallback=True)
             return self._fallback_chat_response(user_message)
     
     async def enhance_improvement_suggestions(
@@ -148,29 +311,128 @@ Provide helpful, encouraging, and actionable advice. Be specific and practical."
     ) -> List[str]:
         """Enhance improvement suggestions with LLM"""
         if not self.client:
+            self._track("enhance_suggestions", fallback=True)
             return base_suggestions
         
-        prompt = f"""Enhance these learning suggestions for {skill}:
-
-{chr(10).join(f'{i+1}. {s}' for i, s in enumerate(base_suggestions))}
-
-Make them more specific, actionable, and motivating. Add concrete examples and tips."""
+        builder = PromptBuilder("enhance_suggestions")
+        builder.add("instructions", f"Enhance these learning suggestions for {skill}:")
+        builder.add(
+            "suggestions",
+            chr(10).join(f'{i+1}. {s}' for i, s in enumerate(base_suggestions)),
+            priority=1
+        )
+        builder.add("format", "Make them more specific, actionable, and motivating. Add concrete examples and tips.")
+        prompt = self._build_prompt(builder)
 
         try:
             response = await self._call_llm(prompt)
             # Parse response into list
             enhanced = [s.strip() for s in response.split('\n') if s.strip() and not s.strip().isdigit()]
+            self._track("enhance_suggestions")
             return enhanced[:len(base_suggestions)] if enhanced else base_suggestions
         except Exception as e:
             print(f"Error enhancing suggestions: {e}")
+            self._track("enhance_suggestions", fallback=True)
             return base_suggestions
     
-    async def _call_llm(self, prompt: str) -> str:
-        """Call the LLM API"""
-        import asyncio
+    def _build_prompt(self, builder: PromptBuilder) -> str:
+        """Build a budgeted prompt and record its size
         
+        Per-prompt stats stay on the (per-call) builder; only the size goes
+        into the shared metrics.
+        """
+        prompt = builder.build()
+        llm_prompt_tokens.observe(builder.stats["tokens"], operation=builder.name)
+        return prompt
+    
+    def _track(self, operation: str, fallback: bool = False):
+        """Count a call and whether it was served by a fallback"""
+        stats = self.call_stats.setdefault(operation, {"calls": 0, "fallbacks": 0})
+        stats["calls"] += 1
+        if fallback:
+            stats["fallbacks"] += 1
+        llm_requests.inc(operation=operation, result="fallback" if fallback else "ok")
+    
+    def get_status(self) -> Dict:
+        """Provider health, limiter state and fallback rates"""
+        provider = self._provider_name()
+        return {
+            "provider": provider,
+            "circuit_breaker": self.circuit_breakers[provider].status() if provider else None,
+            "rate_limiter": self.rate_limiters[provider].status() if provider else None,
+            "latency_slo_seconds": settings.llm_timeout_seconds,
+            "operations": {
+                operation: {
+                    **stats,
+                    "fallback_rate": round(stats["fallbacks"] / stats["calls"], 3) if stats["calls"] else 0.0
+                }
+                for operation, stats in self.call_stats.items()
+            }
+        }
+    
+    def _provider_name(self) -> Optional[str]:
+        """Name of the configured LLM provider"""
+        if self.use_gemini and hasattr(self.client, 'generate_content'):
+            return "gemini"
+        elif hasattr(self.client, 'chat'):
+            return "openai"
+        return None
+    
+    async def _call_llm(self, prompt: str, max_output_tokens: Optional[int] = None) -> str:
+        """Call the LLM API, guarded by the rate limiter, circuit breaker and latency SLO"""
+        provider = self._provider_name()
+        if provider is None:
+            raise Exception("No valid LLM client available")
+        breaker = self.circuit_breakers[provider]
+        
+        if not breaker.allow():
+            raise LLMUnavailableError(f"{provider} unhealthy (circuit open)")
+        
+        recorded = False
+        try:
+            if not await self.rate_limiters[provider].acquire(max_wait=settings.llm_rate_limit_max_wait):
+                raise LLMUnavailableError(f"{provider} rate limit reached")
+            
+            start = time.perf_counter()
+            try:
+                with span("llm.call"):
+                    response = await asyncio.wait_for(
+                        self._call_provider(prompt, max_output_tokens),
+                        timeout=settings.llm_timeout_seconds
+                    )
+            except asyncio.TimeoutError:
+                latency = time.perf_counter() - start
+                breaker.record(latency, success=False)
+                recorded = True
+                llm_call_duration.observe(latency, provider=provider, outcome="timeout")
+                raise LLMUnavailableError(f"LLM call exceeded {settings.llm_timeout_seconds}s SLO")
+            except Exception:
+                latency = time.perf_counter() - start
+                breaker.record(latency, success=False)
+                recorded = True
+                llm_call_duration.observe(latency, provider=provider, outcome="error")
+                raise
+            
+            latency = time.perf_counter() - start
+            breaker.record(latency, success=True)
+            recorded = True
+            llm_call_duration.observe(latency, provider=provider, outcome="ok")
+            return response
+        finally:
+            # Rate limited or cancelled (e.g. the SSE client went away) before an
+            # outcome was recorded: give a half-open probe slot back
+            if not recorded:
+                breaker.release()
+    
+    async def _call_provider(self, prompt: str, max_output_tokens: Optional[int] = None) -> str:
+        """Send a prompt to the configured provider"""
         def sync_gemini_call():
-            response = self.client.generate_content(prompt)
+            if max_output_tokens:
+                response = self.client.generate_content(
+                    prompt, generation_config={"max_output_tokens": max_output_tokens}
+                )
+            else:
+                response = self.client.generate_content(prompt)
             return response.text
         
         def sync_openai_call():
@@ -180,19 +442,17 @@ Make them more specific, actionable, and motivating. Add concrete examples and t
                     {"role": "system", "content": "You are a helpful career coach and skill development expert."},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=500,
+                max_tokens=min(max_output_tokens or settings.llm_output_tokens, settings.llm_max_output_tokens),
                 temperature=0.7
             )
             return response.choices[0].message.content
         
         if self.use_gemini and hasattr(self.client, 'generate_content'):
             # Gemini API - run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, sync_gemini_call)
+            return await run_in_executor("llm", sync_gemini_call)
         elif hasattr(self.client, 'chat'):
             # OpenAI API - run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, sync_openai_call)
+            return await run_in_executor("llm", sync_openai_call)
         else:
             raise Exception("No valid LLM client available")
     
@@ -0,0 +1,286 @@
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Metric:
+    """Base for labelled metrics rendered in the Prometheus text format"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()  # Mongo listeners and executor threads record too
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._labels(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._labels(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{self._labels(key, [('le', repr(float(bound)))])} {cumulative}")
+                lines.append(f"{self.name}_bucket{self._labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+                lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics exposed on /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route, including streamed response bodies",
+    ["method", "route", "status"]
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served"
+)
+
+# Pipeline stages (fed by tracing spans)
+stage_duration = registry.histogram(
+    "stage_duration_seconds", "Duration of traced pipeline stages", ["stage"]
+)
+
+# Embedding model
+encode_batch_size = registry.histogram(
+    "model_encode_batch_size", "Texts per sentence model encode call", ["caller"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+encode_duration = registry.histogram(
+    "model_encode_duration_seconds", "Sentence model encode latency", ["caller"]
+)
+
+# LLM
+llm_call_duration = registry.histogram(
+    "llm_call_duration_seconds", "LLM provider call latency", ["provider", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+)
+llm_prompt_tokens = registry.histogram(
+    "llm_prompt_tokens", "Estimated prompt size per LLM operation", ["operation"],
+    buckets=(100, 250, 500, 750, 1000, 1500, 2000, 3000)
+)
+llm_requests = registry.counter(
+    "llm_requests_total", "LLM-backed operations by whether a fallback answered", ["operation", "result"]
+)
+
+# Caches (hit ratio = hits / (hits + misses))
+cache_lookups = registry.counter(
+    "cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+
+# Thread pool executors
+executor_queued = registry.gauge(
+    "executor_queued_tasks", "Tasks submitted to an executor and not yet started", ["executor"]
+)
+executor_running = registry.gauge(
+    "executor_running_tasks", "Tasks currently running in an executor", ["executor"]
+)
+executor_wait = registry.histogram(
+    "executor_queue_wait_seconds", "Time tasks wait for an executor thread", ["executor"]
+)
+
+# MongoDB
+mongo_command_duration = registry.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ["command", "outcome"]
+)
+
+# Analysis write-behind buffer
+analysis_write_queue = registry.gauge(
+    "analysis_write_queue_depth", "Analyses waiting to be written"
+)
+analysis_flush_duration = registry.histogram(
+    "analysis_write_flush_duration_seconds", "Latency of batched analysis inserts"
+)
+analysis_writes = registry.counter(
+    "analysis_writes_total", "Analyses handled by the write-behind buffer", ["result"]
+)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup"""
+    cache_lookups.inc(cache=cache, result="hit" if hit else "miss")
+
+
+async def run_in_executor(name: str, fn: Callable, *args, executor=None):
+    """Run fn in a thread pool executor, tracking queue depth and wait time
+    
+    fn runs in a copy of the caller's context, so tracing spans opened in
+    the thread attach to the request's trace.
+    """
+    submitted = time.perf_counter()
+    context = contextvars.copy_context()
+    executor_queued.inc(executor=name)
+    state = {"dequeued": False}
+    lock = threading.Lock()
+
+    def dequeue() -> bool:
+        with lock:
+            if state["dequeued"]:
+                return False
+            state["dequeued"] = True
+        executor_queued.dec(executor=name)
+        return True
+
+    def run():
+        if dequeue():
+            executor_wait.observe(time.perf_counter() - submitted, executor=name)
+        executor_running.inc(executor=name)
+        try:
+            return context.run(fn, *args)
+        finally:
+            executor_running.dec(executor=name)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, run)
+    finally:
+        # No-op unless the caller was cancelled before a thread picked the task up
+        dequeue()
@@ -1,8 +1,14 @@
 import spacy
 import re
-from typing import List, Dict, Tuple
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Set, Optional
 from sentence_transformers import SentenceTransformer
 import numpy as np
+from app.config import settings
+from app.services.metrics import encode_batch_size, encode_duration, record_cache
+from app.services.skill_vocabulary import SkillVocabulary, SkillSet
+from app.services.skill_taxonomy import SkillTaxonomy
 
 
 def cosine_similarity_numpy(a, b):
@@ -21,46 +27,53 @@ class NLPService:
         self.sentence_model = None
         self._initialize_models()
         
-        # Common technical skills and tools
-        self.tech_skills = {
-            'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust', 'php', 'swift', 'kotlin', 'r', 'matlab', 'scala',
-            'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'fastapi', 'nextjs', 'nuxt', 'svelte',
-            'spring', 'hibernate', 'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'xgboost', 'lightgbm',
-            'pandas', 'numpy', 'sql', 'mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch', 'dynamodb', 'cassandra', 'neo4j',
-            'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'terraform', 'jenkins', 'gitlab', 'circleci', 'ansible', 'chef', 'puppet',
-            'git', 'github', 'jira', 'agile', 'scrum', 'ci/cd', 'rest api', 'graphql', 'soap',
-            'html', 'css', 'tailwind', 'bootstrap', 'sass', 'less', 'webpack', 'vite', 'rollup', 'babel',
-            'machine learning', 'deep learning', 'nlp', 'computer vision', 'data science', 'artificial intelligence',
-            'api', 'microservices', 'oauth', 'jwt', 'websocket', 'grpc', 'rest', 'rpc',
-            'hadoop', 'spark', 'kafka', 'rabbitmq', 'nginx', 'apache', 'linux', 'unix', 'bash', 'powershell',
-            'mlops', 'devops', 'dataops', 'airflow', 'mlflow', 'kubeflow', 'sagemaker',
-            'bert', 'gpt', 'transformer', 'lstm', 'cnn', 'rnn', 'gan',
-            'tableau', 'powerbi', 'looker', 'metabase', 'grafana',
-            'selenium', 'cypress', 'jest', 'pytest', 'junit', 'mocha', 'chai'
-        }
+        # Skill taxonomy (skills, aliases, categories, matcher and embedding index).
+        # Swapped atomically by reload_taxonomy; readers take one reference per call.
+        self.taxonomy = self.build_taxonomy()
+        self.taxonomy_generation = 1
         
-        # Words to explicitly exclude from skill extraction
-        self.excluded_words = {
-            'we', 'you', 'our', 'your', 'the', 'and', 'for', 'with', 'from', 'this', 'that',
-            'have', 'has', 'been', 'were', 'was', 'are', 'is', 'am', 'will', 'would', 'should',
-            'can', 'could', 'may', 'might', 'must', 'about', 'into', 'through', 'during',
-            'before', 'after', 'above', 'below', 'between', 'under', 'again', 'further',
-            'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'both',
-            'each', 'few', 'more', 'most', 'other', 'some', 'such', 'only', 'own', 'same',
-            'so', 'than', 'too', 'very', 'can', 'just', 'should', 'now', 'key', 'role',
-            'team', 'work', 'company', 'remote', 'type', 'required', 'preferred', 'strong',
-            'knowledge', 'experience', 'proficiency', 'understanding', 'ability', 'skills',
-            'qualifications', 'responsibilities', 'designing', 'building', 'developing',
-            'stay', 'solid', 'latest', 'collaborative', 'flexible', 'full-time', 'part-time',
-            'location', 'salary', 'benefits', 'cover', 'letter', 'resume', 'profile',
-            'links', 'about', 'engineer', 'developer', 'scientist', 'analyst', 'manager',
-            'what', 'corp', 'inc', 'ltd', 'llc', 'design', 'build', 'monitor', 'master',
-            'learning', 'practices', 'solutions', 'products', 'frameworks', 'algorithms',
-            'models', 'pipelines', 'platforms', 'tools', 'technologies', 'projects',
-            'competitive', 'match', 'environment', 'hardware', 'contribute', 'collaborate',
-            'face', 'databases', 'apis', 'open-source', 'big', 'data', 'statistics',
-            'mathematics', 'computer', 'science', 'phd', 'master', 'bachelor', 'degree'
-        }
+        # Per-document cache of normalized experience maps
+        self._experience_cache: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._experience_lock = threading.Lock()  # Analyses run on several threads
+    
+    def clear_caches(self):
+        """Drop per-document caches"""
+        with self._experience_lock:
+            self._experience_cache.clear()
+    
+    @property
+    def tech_skills(self) -> Set[str]:
+        return self.taxonomy.skills
+    
+    @property
+    def excluded_words(self) -> Set[str]:
+        return self.taxonomy.excluded_words
+    
+    @property
+    def skill_categories(self) -> Dict[str, str]:
+        return self.taxonomy.categories
+    
+    @property
+    def vocabulary(self) -> SkillVocabulary:
+        return self.taxonomy.vocabulary
+    
+    def build_taxonomy(self, data: Optional[Dict] = None) -> SkillTaxonomy:
+        """Build a taxonomy from data, or from the configured taxonomy file"""
+        if data is None:
+            taxonomy = SkillTaxonomy.from_file(settings.skill_taxonomy_path, self.sentence_model)
+        else:
+            taxonomy = SkillTaxonomy(data, self.sentence_model)
+        
+        if not taxonomy.skills:
+            raise ValueError("Skill taxonomy contains no skills")
+        return taxonomy
+    
+    def set_taxonomy(self, taxonomy: SkillTaxonomy):
+        """Swap in a new taxonomy"""
+        self.taxonomy = taxonomy
+        self.taxonomy_generation += 1
+        self.clear_caches()
+        print(f"Skill taxonomy version {taxonomy.version} loaded ({len(taxonomy.skills)} skills)")
         
     def _initialize_models(self):
         """Lazy load NLP models"""
@@ -81,39 +94,18 @@ class NLPService:
             print(f"Error loading NLP models: {e}")
             
     def extract_skills_from_text(self, text: str) -> List[Dict[str, str]]:
-        """Extract ONLY technical skills from text using pattern matching"""
+        """Extract ONLY technical skills from text using the taxonomy matcher"""
         if not text:
             return []
         
-        text_lower = text.lower()
-        skills = []
-        skills_found = set()
-        
-        # ONLY extract using predefined tech skills (most reliable)
-        for skill in self.tech_skills:
-            pattern = r'\b' + re.escape(skill.replace('.', r'\.')) + r's?\b'  # Allow plural
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                if skill not in skills_found:
-                    skills_found.add(skill)
-                    skills.append({
-                        'name': skill.title(),
-                        'category': self._categorize_skill(skill)
-                    })
-        
-        # Extract multi-word compound names like "Machine Learning", "Data Science"
-        # Only if they appear with capitalization in original text
-        capitalized_phrases = re.findall(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})\b', text)
-        for phrase in capitalized_phrases:
-            phrase_lower = phrase.lower()
-            if (phrase_lower in self.tech_skills and 
-                phrase_lower not in skills_found):
-                skills_found.add(phrase_lower)
-                skills.append({
-                    'name': phrase,
-                    'category': self._categorize_skill(phrase_lower)
-                })
-        
-        return skills
+        taxonomy = self.taxonomy
+        return [
+            {
+                'name': skill.title(),
+                'category': taxonomy.categories.get(skill, 'Other')
+            }
+            for skill in taxonomy.find_skills(text)
+        ]
     
     def _is_likely_skill(self, text: str) -> bool:
         """Check if text is likely a technical skill"""
@@ -159,24 +151,7 @@ class NLPService:
     
     def _categorize_skill(self, skill: str) -> str:
         """Categorize skill into broad categories"""
-        skill_lower = skill.lower()
-        
-        categories = {
-            'Programming Languages': ['python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust', 'php', 'swift', 'kotlin'],
-            'Frontend': ['react', 'angular', 'vue', 'html', 'css', 'tailwind', 'bootstrap', 'sass', 'webpack', 'vite'],
-            'Backend': ['node.js', 'express', 'django', 'flask', 'fastapi', 'spring', 'hibernate', '.net'],
-            'Database': ['sql', 'mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch', 'dynamodb', 'cassandra'],
-            'DevOps': ['docker', 'kubernetes', 'aws', 'azure', 'gcp', 'terraform', 'jenkins', 'gitlab', 'ci/cd'],
-            'AI/ML': ['tensorflow', 'pytorch', 'keras', 'scikit-learn', 'machine learning', 'deep learning', 'nlp', 'computer vision'],
-            'Data Science': ['pandas', 'numpy', 'spark', 'hadoop', 'data science', 'analytics'],
-            'Tools': ['git', 'github', 'jira', 'vscode', 'postman']
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in skill_lower for keyword in keywords):
-                return category
-        
-        return 'Other'
+        return self.skill_categories.get(skill.lower(), 'Other')
     
     def compute_semantic_similarity(self, text1: str, text2: str) -> float:
         """Compute semantic similarity between two texts"""
@@ -184,52 +159,102 @@ class NLPService:
             return 0.0
         
         try:
-            embeddings = self.sentence_model.encode([text1, text2])
+            embeddings = self._encode([text1, text2], "semantic_similarity")
             similarity = cosine_similarity_numpy(embeddings[0], embeddings[1])[0][0]
             return float(similarity)
         except Exception as e:
             print(f"Error computing similarity: {e}")
             return 0.0
     
+    def encode_texts(self, texts: List[str], caller: str = "encode_texts"):
+        """Embed texts in one batch. Returns None if the model is unavailable."""
+        if not self.sentence_model or not texts:
+            return None
+        
+        try:
+            return self._encode(texts, caller)
+        except Exception as e:
+            print(f"Error encoding texts: {e}")
+            return None
+    
+    def _encode(self, texts: List[str], caller: str):
+        """Run the sentence model, recording batch size and latency"""
+        encode_batch_size.observe(len(texts), caller=caller)
+        with encode_duration.time(caller=caller):
+            return self.sentence_model.encode(texts)
+    
     def compute_skill_match(self, resume_skills: List[str], job_skills: List[str]) -> Tuple[float, List[str], List[str]]:
         """Compute skill match between resume and job description"""
         if not resume_skills or not job_skills:
             return 0.0, [], job_skills
         
-        resume_skills_lower = [s.lower() for s in resume_skills]
-        job_skills_lower = [s.lower() for s in job_skills]
+        # Canonicalize aliases ("Postgres" -> "postgresql") so most matches are hash lookups
+        taxonomy = self.taxonomy
+        resume_keys = {taxonomy.canonicalize(s) or s.lower() for s in resume_skills}
         
         matched_skills = []
         missing_skills = []
+        leftovers = []
         
         # Direct matches
         for job_skill in job_skills:
-            if job_skill.lower() in resume_skills_lower:
+            if (taxonomy.canonicalize(job_skill) or job_skill.lower()) in resume_keys:
                 matched_skills.append(job_skill)
             else:
-                # Check for semantic similarity
-                found_match = False
-                if self.sentence_model:
-                    try:
-                        job_embedding = self.sentence_model.encode([job_skill])
-                        for resume_skill in resume_skills:
-                            resume_embedding = self.sentence_model.encode([resume_skill])
-                            similarity = cosine_similarity_numpy(job_embedding[0], resume_embedding[0])[0][0]
-                            if similarity > 0.8:  # High similarity threshold
-                                matched_skills.append(job_skill)
-                                found_match = True
-                                break
-                    except:
-                        pass
-                
-                if not found_match:
-                    missing_skills.append(job_skill)
+                leftovers.append(job_skill)
+        
+        # Semantic similarity only for the skills left unmatched, in one batch
+        close = [False] * len(leftovers)
+        if leftovers:
+            embeddings = self.encode_texts(leftovers + list(resume_skills), "skill_match")
+            if embeddings is not None:
+                embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+                similarity = embeddings[:len(leftovers)] @ embeddings[len(leftovers):].T
+                close = similarity.max(axis=1) > 0.8  # High similarity threshold
+        
+        for job_skill, is_close in zip(leftovers, close):
+            if is_close:
+                matched_skills.append(job_skill)
+            else:
+                missing_skills.append(job_skill)
         
         # Calculate match percentage
         match_percentage = (len(matched_skills) / len(job_skills) * 100) if job_skills else 0.0
         
         return match_percentage, matched_skills, missing_skills
     
+    def extract_skill_set(self, text: str) -> SkillSet:
+        """Extract skills and experience from text as a compact SkillSet"""
+        taxonomy = self.taxonomy
+        return taxonomy.vocabulary.encode(taxonomy.find_skills(text or ""), self.extract_skill_experience(text))
+    
+    def match_skill_sets(self, resume: SkillSet, job: SkillSet) -> Tuple[float, List[int], List[int]]:
+        """Match skill sets by bitset intersection, with semantic matching for the leftovers
+        
+        Returns the match percentage and the matched and missing job skill IDs.
+        """
+        if not len(resume) or not len(job):
+            return 0.0, [], [int(i) for i in job.ids]
+        
+        vocabulary = self.vocabulary
+        embeddings = self.taxonomy.embeddings
+        matched_bits = job.bits & resume.bits
+        missing = vocabulary.from_bits(job.bits & ~resume.bits)
+        
+        # Check unmatched job skills for semantic near-equivalents in the resume
+        if missing and embeddings is not None:
+            try:
+                similarity = embeddings[missing] @ embeddings[resume.ids].T
+                close = similarity.max(axis=1) > 0.8  # High similarity threshold
+                matched_bits |= vocabulary.to_bits(i for i, c in zip(missing, close) if c)
+                missing = [i for i, c in zip(missing, close) if not c]
+            except Exception as e:
+                print(f"Error computing skill similarity: {e}")
+        
+        matched = vocabulary.from_bits(matched_bits)
+        match_percentage = len(matched) / len(job) * 100
+        return match_percentage, matched, missing
+    
     def extract_experience_years(self, text: str) -> Dict[str, int]:
         """Extract years of experience mentioned in text"""
         experience_pattern = r'(\d+)[\+]?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:experience\s+)?(?:in\s+|with\s+)?([a-zA-Z\s\.\+\-]+)'
@@ -242,6 +267,37 @@ class NLPService:
             experience_dict[skill] = years
         
         return experience_dict
+    
+    def extract_skill_experience(self, text: str) -> Dict[str, int]:
+        """Extract years of experience per canonical skill ID (lowercase tech_skills name)
+        
+        Experience phrases such as "5+ years of experience with Python and Django"
+        are resolved against the skill vocabulary, so each skill maps to the
+        largest number of years stated for it. Results are cached per document.
+        """
+        if not text:
+            return {}
+        
+        with self._experience_lock:
+            cached = self._experience_cache.get(text)
+            if cached is not None:
+                self._experience_cache.move_to_end(text)
+        record_cache("skill_experience", cached is not None)
+        if cached is not None:
+            return cached
+        
+        experience_pattern = r'(\d+)\+?\s*(?:years?|yrs?)(?:\s+of)?\s+([a-z \t\.\+\-#/]{1,80})'
+        experience: Dict[str, int] = {}
+        for match in re.finditer(experience_pattern, text.lower()):
+            years = int(match.group(1))
+            for skill_id in self.taxonomy.find_skills(match.group(2)):
+                experience[skill_id] = max(experience.get(skill_id, 0), years)
+        
+        with self._experience_lock:
+            self._experience_cache[text] = experience
+            while len(self._experience_cache) > 128:
+                self._experience_cache.popitem(last=False)
+        return experience
 
 
 # Singleton instance
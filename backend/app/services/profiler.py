@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+# Paths of requests counted by "next N analysis requests" sessions
+ANALYSIS_PATHS = ("/api/analysis/analyze", "/api/analysis/reanalyze")
+
+# Pipeline stage rules, checked against each frame from the innermost outwards.
+# The first frame that matches decides the stage of the whole sample.
+STAGE_RULES: List[Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = [
+    # (stage, path fragments, function names)
+    ("idle", ("periodic_executor.py",), ()),  # Driver background monitors
+    ("file_parse", ("pdfplumber", "pdfminer", "PyPDF2", "docx", "file_service.py"), ()),
+    ("encode", ("sentence_transformers", "torch", "transformers"), ("_encode",)),
+    ("regex_extraction", ("skill_taxonomy.py",), (
+        "extract_skills_from_text", "extract_skill_experience", "extract_experience_years",
+        "_score_importance", "_split_chunks"
+    )),
+    ("llm_wait", ("openai", "generativeai", "google/api_core"), ("sync_gemini_call", "sync_openai_call")),
+    ("db", ("pymongo", "motor", "beanie", "mongomock", "bson"), ()),
+    ("analysis", ("analysis_service.py", "nlp_service.py", "skill_vocabulary.py"), ()),
+]
+
+# Leaf frames of threads waiting for work
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfileSession:
+    """Samples collected by one profiling run"""
+
+    def __init__(self, interval: float, request_limit: Optional[int] = None):
+        self.interval = interval
+        self.request_limit = request_limit
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.stacks: Counter = Counter()
+        self.stages: Counter = Counter()
+        self.samples = 0
+        self.requests_in_flight = 0
+        self.requests_finished = 0
+        self.stop_event = threading.Event()
+        self.done = asyncio.Event()  # Set on the event loop when request_limit is reached
+
+    def folded(self) -> str:
+        """Samples in collapsed-stack format (flamegraph.pl, speedscope, inferno)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict:
+        return {
+            "started_at": self.started_at,
+            "duration_s": round(self.duration, 3) if self.duration is not None else None,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "requests_profiled": self.requests_finished if self.request_limit else None,
+            "stages": {
+                stage: {"samples": count, "share": round(count / self.samples, 4)}
+                for stage, count in self.stages.most_common()
+            } if self.samples else {}
+        }
+
+
+class SamplingProfiler:
+    """Low-overhead wall-clock sampling profiler for the running worker
+
+    A background thread snapshots every thread's Python stack with
+    sys._current_frames() at a fixed interval. Each sample is tagged with
+    the pipeline stage it belongs to (file parse, regex extraction, encode,
+    LLM wait, DB) and emitted as the root frame of a collapsed stack, so
+    flamegraphs group by stage. Only one session runs at a time and only
+    the worker process serving the request is profiled.
+    """
+
+    def __init__(self):
+        self._session: Optional[ProfileSession] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._code_stages: Dict = {}  # code object -> stage or None
+        self._code_labels: Dict = {}
+
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+
+    def start(self, interval: float, request_limit: Optional[int] = None) -> ProfileSession:
+        """Start a session. Raises RuntimeError if one is already running."""
+        with self._lock:
+            if self._session is not None:
+                raise RuntimeError("A profiling session is already running")
+            session = ProfileSession(interval, request_limit)
+            self._session = session
+        self._thread = threading.Thread(target=self._run, args=(session,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return session
+
+    def stop(self) -> Optional[ProfileSession]:
+        """Stop the running session and return it"""
+        with self._lock:
+            session, self._session = self._session, None
+            if session is None:
+                return None
+            session.stop_event.set()
+            session.duration = time.perf_counter() - session.start
+        return session
+
+    def request_started(self, path: str) -> Optional[ProfileSession]:
+        """Called by the metrics middleware; returns the session profiling this request, if any"""
+        session = self._session
+        if session is None or not session.request_limit or not path.startswith(ANALYSIS_PATHS):
+            return None
+        session.requests_in_flight += 1
+        return session
+
+    def request_finished(self, session: ProfileSession):
+        session.requests_in_flight -= 1
+        session.requests_finished += 1
+        if session.requests_finished >= session.request_limit:
+            session.done.set()
+
+    def _run(self, session: ProfileSession):
+        own_id = threading.get_ident()
+        while not session.stop_event.wait(session.interval):
+            # Request-scoped sessions only sample while a profiled request is running
+            if session.request_limit and session.requests_in_flight <= 0:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                if session.stop_event.is_set():
+                    break
+                for thread_id, frame in frames.items():
+                    if thread_id != own_id:
+                        self._record(session, frame)
+            del frames
+
+    def _record(self, session: ProfileSession, frame):
+        labels = []
+        stage = None
+        leaf = frame.f_code
+        while frame is not None:
+            code = frame.f_code
+            if stage is None:
+                stage = self._stage_for(code)
+            label = self._code_labels.get(code)
+            if label is None:
+                label = f"{code.co_name} ({os.path.basename(code.co_filename)})".replace(";", ":")
+                self._code_labels[code] = label
+            labels.append(label)
+            frame = frame.f_back
+
+        if stage is None:
+            stage = "idle" if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES else "other"
+        if stage == "idle":
+            return
+
+        labels.append(f"stage:{stage}")
+        session.stacks[";".join(reversed(labels))] += 1
+        session.stages[stage] += 1
+        session.samples += 1
+
+    def _stage_for(self, code) -> Optional[str]:
+        if code in self._code_stages:
+            return self._code_stages[code]
+        stage = None
+        filename = code.co_filename.replace("\\", "/")
+        for name, paths, functions in STAGE_RULES:
+            if code.co_name in functions or any(fragment in filename for fragment in paths):
+                stage = name
+                break
+        self._code_stages[code] = stage
+        return stage
+
+
+# Singleton instance
+profiler = SamplingProfiler()
@@ -0,0 +1,162 @@
+from typing import Dict, List, Optional
+from app.config import settings
+
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate token count of text (~4 characters per token)"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Truncate text to an estimated token limit, cutting at a word boundary"""
+    if not text or max_tokens <= 0:
+        return ""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 3]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "..."
+
+
+class _Section:
+    """A piece of a prompt competing for the token budget"""
+
+    def __init__(
+        self,
+        name: str,
+        text: str = "",
+        priority: int = 0,
+        max_tokens: Optional[int] = None,
+        messages: Optional[List[Dict]] = None
+    ):
+        self.name = name
+        self.text = text
+        self.priority = priority
+        self.max_tokens = max_tokens
+        self.messages = messages
+        self.rendered = ""
+
+
+class PromptBuilder:
+    """Assemble LLM prompts that fit within a token budget
+
+    Sections with priority 0 are always kept in full. Remaining budget is
+    handed to the other sections in priority order (lower first); text is
+    truncated and chat history drops its oldest turns first.
+    """
+
+    def __init__(self, name: str, budget: Optional[int] = None):
+        self.name = name
+        self.budget = budget or settings.prompt_token_budget
+        self._sections: List[_Section] = []
+        self.stats: Dict = {}
+
+    def add(
+        self,
+        name: str,
+        text: str,
+        priority: int = 0,
+        max_tokens: Optional[int] = None
+    ) -> "PromptBuilder":
+        """Add a text section"""
+        if text:
+            self._sections.append(_Section(name, text, priority, max_tokens))
+        return self
+
+    def add_history(
+        self,
+        messages: Optional[List[Dict]],
+        priority: int = 2,
+        max_tokens: Optional[int] = None
+    ) -> "PromptBuilder":
+        """Add chat history, keeping the most recent turns that fit"""
+        if messages:
+            self._sections.append(
+                _Section("history", priority=priority, max_tokens=max_tokens, messages=messages)
+            )
+        return self
+
+    def build(self) -> str:
+        """Render the prompt and record its size"""
+        remaining = self.budget
+        truncated = []
+        dropped_messages = 0
+
+        # Required sections first
+        for section in self._sections:
+            if section.priority == 0:
+                section.rendered = section.text
+                remaining -= estimate_tokens(section.text)
+
+        optional = sorted(
+            (s for s in self._sections if s.priority > 0),
+            key=lambda s: s.priority
+        )
+        for section in optional:
+            allowance = max(remaining, 0)
+            if section.max_tokens is not None:
+                allowance = min(allowance, section.max_tokens)
+
+            if section.messages is not None:
+                section.rendered, dropped = self._fit_history(section.messages, allowance)
+                dropped_messages += dropped
+            else:
+                section.rendered = truncate_to_tokens(section.text, allowance)
+                if section.rendered != section.text:
+                    truncated.append(section.name)
+
+            remaining -= estimate_tokens(section.rendered)
+
+        prompt = "\n\n".join(s.rendered for s in self._sections if s.rendered)
+        self.stats = {
+            "name": self.name,
+            "tokens": estimate_tokens(prompt),
+            "budget": self.budget,
+            "truncated_sections": truncated,
+            "dropped_messages": dropped_messages
+        }
+        if truncated or dropped_messages:
+            print(
+                f"Prompt '{self.name}' over budget: ~{self.stats['tokens']}/{self.budget} tokens"
+                + (f", truncated {truncated}" if truncated else "")
+                + (f", dropped {dropped_messages} messages" if dropped_messages else "")
+            )
+        return prompt
+
+    def _fit_history(self, messages: List[Dict], max_tokens: int):
+        """Keep the newest messages within max_tokens, summarizing dropped ones"""
+        kept: List[str] = []
+        used = 0
+        index = len(messages)
+        for msg in reversed(messages):
+            line = f"{msg['role']}: {msg['content']}"
+            cost = estimate_tokens(line) + 1
+            if used + cost > max_tokens:
+                break
+            kept.append(line)
+            used += cost
+            index -= 1
+
+        dropped = messages[:index]
+        lines = list(reversed(kept))
+        if dropped:
+            # Short summary of what the user asked about in the dropped turns
+            topics = [
+                " ".join(m['content'].split()[:8])
+                for m in dropped if m.get('role') == 'user'
+            ]
+            if topics and max_tokens - used >= 16:
+                lines.insert(0, truncate_to_tokens(
+                    "Earlier in this conversation the user asked about: " + "; ".join(topics),
+                    max_tokens - used
+                ))
+
+        return "\n".join(lines), len(dropped)
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class LLMUnavailableError(Exception):
+    """Raised when an LLM call is rejected without reaching the provider"""
+    pass
+
+
+class TokenBucket:
+    """Token-bucket rate limiter"""
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0  # Tokens per second
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, max_wait: float = 0.0) -> bool:
+        """Take a token, waiting up to max_wait seconds. Returns False if rate limited."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+
+        if self.rate <= 0:
+            return False
+        wait = (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            return False
+
+        # Reserve the token now so concurrent callers queue behind us
+        self.tokens -= 1
+        await asyncio.sleep(wait)
+        return True
+
+    def status(self) -> Dict:
+        self._refill()
+        return {
+            "tokens_available": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "rate_per_minute": round(self.rate * 60, 2)
+        }
+
+
+class CircuitBreaker:
+    """Latency-aware circuit breaker
+
+    Tracks the outcome of the last `window` calls. Errors, timeouts and calls
+    slower than `slow_call_seconds` count as failures; when the failure ratio
+    reaches `failure_ratio` the breaker opens and rejects calls for `cooldown`
+    seconds, then lets a single probe through (half-open).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window: int = 10,
+        failure_ratio: float = 0.5,
+        slow_call_seconds: float = 8.0,
+        cooldown: float = 30.0,
+        min_calls: int = 4
+    ):
+        self.window = window
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self.min_calls = min_calls
+
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self._outcomes = deque(maxlen=window)  # True = failure
+        self._probe_in_flight = False
+        self._latencies = deque(maxlen=window)
+
+    def allow(self) -> bool:
+        """Check whether a call may go to the provider"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+
+        return True
+
+    def release(self):
+        """Give back a half-open probe slot for a call that never ran"""
+        self._probe_in_flight = False
+
+    def record(self, latency: float, success: bool):
+        """Record the outcome of a provider call"""
+        self._latencies.append(latency)
+        failed = not success or latency > self.slow_call_seconds
+
+        if self.state == self.OPEN:
+            # Call started before the breaker opened
+            return
+
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+            if failed:
+                self._open()
+            else:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append(failed)
+        if (len(self._outcomes) >= self.min_calls and
+                sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio):
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._outcomes.clear()
+        print(f"LLM circuit breaker opened for {self.cooldown}s")
+
+    def status(self) -> Dict:
+        latencies = sorted(self._latencies)
+        return {
+            "state": self.state,
+            "recent_failures": sum(self._outcomes),
+            "recent_calls": len(self._outcomes),
+            "recent_p50_latency": round(latencies[len(latencies) // 2], 3) if latencies else None,
+            "retry_in": (
+                round(max(self.cooldown - (time.monotonic() - self.opened_at), 0), 1)
+                if self.state == self.OPEN else None
+            )
+        }
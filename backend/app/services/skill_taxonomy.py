@@ -0,0 +1,139 @@
+import re
+import json
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from app.services.skill_vocabulary import SkillVocabulary
+
+
+# Candidate tokens: words that may contain tech punctuation (c++, c#, node.js, ci/cd, scikit-learn)
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+(?:[/\-][a-z0-9+#.]+)*")
+
+
+def compact_key(name: str) -> str:
+    """Spelling-insensitive form of a skill name ("Node JS", "node.js" -> "nodejs")"""
+    return re.sub(r'[\s._/\-]+', '', name.lower())
+
+
+class SkillTaxonomy:
+    """Versioned skill taxonomy with a precompiled matcher and embedding index
+
+    Matching tokenizes text once and looks up word n-grams in a hash index of
+    skill names and aliases, so its cost depends on text length rather than
+    on the number of skills in the taxonomy.
+    """
+
+    def __init__(self, data: Dict, sentence_model=None):
+        self.version = str(data.get('version', '0'))
+
+        self.categories: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        for entry in data.get('skills', []):
+            name = entry['name'].strip().lower()
+            self.categories[name] = entry.get('category') or 'Other'
+            for alias in entry.get('aliases', []) + entry.get('synonyms', []):
+                self.aliases.setdefault(alias.strip().lower(), name)
+
+        self.skills: Set[str] = set(self.categories)
+        self.excluded_words: Set[str] = {w.lower() for w in data.get('excluded_words', [])}
+        self.learning_paths: Dict[str, List[str]] = {
+            skill.lower(): path for skill, path in data.get('learning_paths', {}).items()
+        }
+        self.vocabulary = SkillVocabulary(self.skills, self.categories)
+
+        # Matcher index: skill names and aliases -> canonical skill
+        self.index: Dict[str, str] = {**self.aliases, **{name: name for name in self.skills}}
+        self.max_ngram = max((len(key.split()) for key in self.index), default=1)
+        
+        # Spelling variants: compact key -> canonical skill, dropping ambiguous keys
+        self.compact_index: Dict[str, str] = {}
+        ambiguous = set()
+        for key, skill in self.index.items():
+            compact = compact_key(key)
+            if self.compact_index.setdefault(compact, skill) != skill:
+                ambiguous.add(compact)
+        for compact in ambiguous:
+            del self.compact_index[compact]
+
+        # Normalized name embeddings, one row per vocabulary ID
+        self.embeddings: Optional[np.ndarray] = None
+        if sentence_model is not None and len(self.vocabulary):
+            try:
+                embeddings = np.asarray(sentence_model.encode(self.vocabulary.display_names))
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                self.embeddings = embeddings / norms
+            except Exception as e:
+                print(f"Error building skill embedding index: {e}")
+
+    @classmethod
+    def from_file(cls, path: str, sentence_model=None) -> "SkillTaxonomy":
+        """Load a taxonomy from a JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), sentence_model)
+
+    def summary(self) -> Dict:
+        """Version and size of the taxonomy"""
+        return {
+            "version": self.version,
+            "skills": len(self.skills),
+            "aliases": len(self.aliases),
+            "embedding_index": self.embeddings is not None
+        }
+
+    def _tokenize(self, text: str) -> List[Tuple[int, str]]:
+        """Split lowercase text into (offset, token) pairs, keeping compound tokens only if they are known"""
+        tokens = []
+        for match in TOKEN_PATTERN.finditer(text):
+            start = match.start()
+            token = match.group(0).rstrip('.')
+            if token.startswith('.') and token not in self.index:
+                stripped = token.lstrip('.')
+                start += len(token) - len(stripped)
+                token = stripped
+            if not token:
+                continue
+            if ('/' in token or '-' in token) and self._lookup(token) is None:
+                for part in re.finditer(r'[^/\-]+', token):
+                    if part.group(0).rstrip('.'):
+                        tokens.append((start + part.start(), part.group(0).rstrip('.')))
+            else:
+                tokens.append((start, token))
+        return tokens
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """Resolve a token or phrase to a canonical skill, allowing a plural 's'"""
+        skill = self.index.get(key)
+        if skill is None and key.endswith('s'):
+            skill = self.index.get(key[:-1])
+        if skill is None:
+            compact = compact_key(key)
+            skill = self.compact_index.get(compact)
+            if skill is None and compact.endswith('s'):
+                skill = self.compact_index.get(compact[:-1])
+        return skill
+
+    def canonicalize(self, name: str) -> Optional[str]:
+        """Map a skill name or alias to its canonical skill, or None if unknown"""
+        key = re.sub(r'\s+', ' ', name.strip().lower())
+        return self._lookup(key) if key else None
+
+    def find_skills(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, in order of first mention"""
+        return list(dict.fromkeys(skill for _, skill in self.find_mentions(text)))
+
+    def find_mentions(self, text: str) -> List[Tuple[int, str]]:
+        """Every skill mention in text as (character offset, canonical skill)"""
+        tokens = self._tokenize(text.lower())
+        mentions = []
+        i = 0
+        while i < len(tokens):
+            # Longest n-gram first so "machine learning" wins over "machine"
+            for n in range(min(self.max_ngram, len(tokens) - i), 0, -1):
+                skill = self._lookup(" ".join(token for _, token in tokens[i:i + n]))
+                if skill is not None:
+                    mentions.append((tokens[i][0], skill))
+                    i += n
+                    break
+            else:
+                i += 1
+        return mentions
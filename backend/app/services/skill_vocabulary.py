@@ -0,0 +1,87 @@
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+class SkillSet:
+    """Skills found in one document, as integer IDs over a SkillVocabulary
+
+    `ids` is a sorted int32 array with a parallel float32 `levels` array
+    (years of experience, 0 when not stated). `bits` holds the same IDs as
+    a bitset so set operations between documents are single int operations.
+    """
+
+    __slots__ = ("ids", "levels", "bits")
+
+    def __init__(self, ids: np.ndarray, levels: np.ndarray, bits: int):
+        self.ids = ids
+        self.levels = levels
+        self.bits = bits
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SkillVocabulary:
+    """Fixed skill vocabulary mapping canonical skill names to integer IDs"""
+
+    def __init__(self, skills: Iterable[str], categories: Optional[Dict[str, str]] = None):
+        self.names: List[str] = sorted(set(skills))
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.display_names: List[str] = [name.title() for name in self.names]
+        categories = categories or {}
+        self.categories: List[str] = [categories.get(name, 'Other') for name in self.names]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get_id(self, name: str) -> Optional[int]:
+        """ID for a skill name, or None if it is not in the vocabulary"""
+        return self.index.get(name.lower())
+
+    def encode(self, names: Iterable[str], experience: Optional[Dict[str, int]] = None) -> SkillSet:
+        """Build a SkillSet from skill names and optional years of experience per skill"""
+        experience = experience or {}
+        ids = {self.index[n] for n in (name.lower() for name in names) if n in self.index}
+        ids.update(self.index[name] for name in experience if name in self.index)
+
+        id_array = np.array(sorted(ids), dtype=np.int32)
+        levels = np.array(
+            [experience.get(self.names[i], 0) for i in id_array],
+            dtype=np.float32
+        )
+        return SkillSet(id_array, levels, self.to_bits(id_array))
+
+    def union(self, skill_sets: Iterable[SkillSet]) -> SkillSet:
+        """Combine skill sets, keeping the highest experience level per skill"""
+        skill_sets = list(skill_sets)
+        if not skill_sets:
+            return SkillSet(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32), 0)
+
+        all_ids = np.concatenate([s.ids for s in skill_sets])
+        all_levels = np.concatenate([s.levels for s in skill_sets])
+        ids, inverse = np.unique(all_ids, return_inverse=True)
+        levels = np.zeros(len(ids), dtype=np.float32)
+        np.maximum.at(levels, inverse, all_levels)
+
+        bits = 0
+        for s in skill_sets:
+            bits |= s.bits
+        return SkillSet(ids.astype(np.int32), levels, bits)
+
+    @staticmethod
+    def to_bits(ids: Iterable[int]) -> int:
+        """Pack skill IDs into an integer bitset"""
+        bits = 0
+        for i in ids:
+            bits |= 1 << int(i)
+        return bits
+
+    @staticmethod
+    def from_bits(bits: int) -> List[int]:
+        """Unpack an integer bitset into sorted skill IDs"""
+        ids = []
+        while bits:
+            low = bits & -bits
+            ids.append(low.bit_length() - 1)
+            bits ^= low
+        return ids
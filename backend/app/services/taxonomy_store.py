@@ -0,0 +1,83 @@
+import asyncio
+from typing import Dict, Optional
+from pymongo import DESCENDING
+from app.config import settings
+from app.models import SkillTaxonomyRevision
+from app.services.nlp_service import nlp_service
+from app.services.skill_taxonomy import SkillTaxonomy
+from app.services.metrics import run_in_executor
+
+
+class TaxonomyStore:
+    """Shares admin-published skill taxonomies between workers
+
+    A reload is saved as the next revision in MongoDB and swapped in on
+    the worker that handled it. Every worker polls for the newest revision
+    every poll_interval seconds (and once at startup) and loads it if it
+    hasn't yet, so all workers converge within poll_interval and a
+    restarted worker comes up with the published taxonomy rather than the
+    bundled file.
+    """
+
+    def __init__(self, poll_interval: float = 30.0):
+        self.poll_interval = poll_interval
+        self.revision = 0  # Revision loaded in this worker, 0 for the bundled file
+        self._lock = asyncio.Lock()
+        self._poll_task: Optional[asyncio.Task] = None
+
+    async def publish(self, data: Dict, taxonomy: SkillTaxonomy) -> int:
+        """Save a built taxonomy as the next revision and load it here
+
+        Raises DuplicateKeyError if another reload took the revision first.
+        """
+        async with self._lock:
+            latest = await self._latest_revision()
+            document = SkillTaxonomyRevision(revision=latest + 1, version=taxonomy.version, data=data)
+            await document.insert()
+            nlp_service.set_taxonomy(taxonomy)
+            self.revision = document.revision
+            return self.revision
+
+    async def sync(self):
+        """Load the newest published taxonomy if this worker is behind"""
+        async with self._lock:
+            if await self._latest_revision() <= self.revision:
+                return
+            document = await SkillTaxonomyRevision.find_all().sort(("revision", DESCENDING)).first_or_none()
+            taxonomy = await run_in_executor("taxonomy", nlp_service.build_taxonomy, document.data)
+            nlp_service.set_taxonomy(taxonomy)
+            self.revision = document.revision
+
+    async def _latest_revision(self) -> int:
+        latest = await SkillTaxonomyRevision.get_motor_collection().find_one(
+            {}, {"revision": 1}, sort=[("revision", DESCENDING)]
+        )
+        return latest["revision"] if latest else 0
+
+    async def _poll_loop(self):
+        """Check for a newer revision at startup and then every poll_interval"""
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Error syncing skill taxonomy: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        """Start the background poll task"""
+        if self._poll_task is None:
+            self._poll_task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        """Stop the background poll task"""
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+
+
+# Singleton instance
+taxonomy_store = TaxonomyStore(poll_interval=settings.taxonomy_poll_interval)
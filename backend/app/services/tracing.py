@@ -0,0 +1,135 @@
+import re
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.services.metrics import stage_duration
+
+
+# W3C trace context: version-traceid-parentid-flags
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+
+MAX_SPANS_PER_TRACE = 200
+RECENT_TRACES = 100
+
+
+class Span:
+    """Timed stage within a trace"""
+
+    __slots__ = ("name", "parent", "start", "duration")
+
+    def __init__(self, name: str, parent: Optional[str]):
+        self.name = name
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+
+
+class Trace:
+    """Spans recorded while serving one request"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "spans": [
+                {
+                    "name": span.name,
+                    "parent": span.parent,
+                    "offset_ms": round((span.start - self.start) * 1000, 3),
+                    "duration_ms": round(span.duration * 1000, 3) if span.duration is not None else None
+                }
+                for span in self.spans
+            ]
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_recent_traces: "deque[Trace]" = deque(maxlen=RECENT_TRACES)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[str]:
+    """Trace ID from a W3C traceparent header, or None if absent or malformed"""
+    if not header:
+        return None
+    match = TRACEPARENT_PATTERN.match(header.strip().lower())
+    return match.group(1) if match else None
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_stage() -> Optional[str]:
+    """Name of the innermost open span in this context"""
+    current = _current_span.get()
+    return current.name if current else None
+
+
+def start_trace(name: str, trace_id: Optional[str] = None) -> Tuple[Trace, Token]:
+    """Start a trace and make it current"""
+    trace = Trace(name, trace_id)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(trace: Trace, token: Token):
+    """Finish a trace started with start_trace and keep it for inspection"""
+    trace.duration = time.perf_counter() - trace.start
+    _current_trace.reset(token)
+    _recent_traces.append(trace)
+
+
+def recent_traces(limit: int = 20) -> List[Dict]:
+    """Most recently finished traces, newest first"""
+    return [trace.to_dict() for trace in list(_recent_traces)[-limit:][::-1]]
+
+
+@contextmanager
+def span(name: str):
+    """Time a stage, recording it on the current trace and the stage histogram"""
+    parent = _current_span.get()
+    current = Span(name, parent.name if parent else None)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _current_span.reset(token)
+        stage_duration.observe(current.duration, stage=name)
+        trace = _current_trace.get()
+        if trace is not None and len(trace.spans) < MAX_SPANS_PER_TRACE:
+            trace.spans.append(current)
+
+
+def traced_stream(stream: AsyncIterator, name: str) -> AsyncIterator:
+    """Run a streaming response body under the trace of the request that created it
+
+    The body of a StreamingResponse is consumed after the endpoint returns,
+    so the trace is captured here and re-entered while iterating, and the
+    whole stream is timed as one span.
+    """
+    trace = _current_trace.get()
+
+    async def run():
+        token = _current_trace.set(trace)
+        try:
+            with span(name):
+                async for chunk in stream:
+                    yield chunk
+        finally:
+            _current_trace.reset(token)
+
+    return run()
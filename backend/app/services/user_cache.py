@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from app.config import settings
+from app.models import User
+from app.services.auth_service import TokenData
+from app.services.metrics import record_cache
+
+
+class UserCache:
+    """Short-lived cache of decoded tokens and user records for request auth
+
+    Saves the JWT decode and the user lookup on most authenticated requests.
+    Entries expire after ttl seconds (tokens also at their own expiry), so
+    changes written by other workers, including deactivating an account,
+    show up within ttl; writes in this worker should call invalidate_user().
+    Users are stored and handed out as copies, so a request that modifies
+    its User never changes the cached one.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._tokens: "OrderedDict[str, Tuple[TokenData, float]]" = OrderedDict()
+        self._users: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+
+    def _get(self, cache: OrderedDict, key: str):
+        entry = cache.get(key)
+        if entry is not None and entry[1] <= time.time():
+            del cache[key]
+            entry = None
+        if entry is None:
+            return None
+        cache.move_to_end(key)
+        return entry[0]
+
+    def _put(self, cache: OrderedDict, key: str, value, expires_at: float):
+        cache[key] = (value, expires_at)
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def get_token(self, token: str) -> Optional[TokenData]:
+        token_data = self._get(self._tokens, token)
+        record_cache("auth_tokens", token_data is not None)
+        return token_data
+
+    def put_token(self, token: str, token_data: TokenData):
+        expires_at = time.time() + self.ttl
+        if token_data.expires_at is not None:
+            expires_at = min(expires_at, token_data.expires_at)
+        self._put(self._tokens, token, token_data, expires_at)
+
+    def get_user(self, user_id: str) -> Optional[User]:
+        user = self._get(self._users, user_id)
+        record_cache("auth_users", user is not None)
+        return user.model_copy(deep=True) if user is not None else None
+
+    def put_user(self, user: User):
+        self._put(self._users, str(user.id), user.model_copy(deep=True), time.time() + self.ttl)
+
+    def invalidate_user(self, user_id) -> None:
+        """Drop a cached user after it was updated or deactivated"""
+        self._users.pop(str(user_id), None)
+
+    def clear(self):
+        self._tokens.clear()
+        self._users.clear()
+
+
+# Singleton instance
+user_cache = UserCache(max_entries=settings.auth_cache_size, ttl=settings.auth_cache_ttl)
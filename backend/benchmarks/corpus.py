@@ -0,0 +1,145 @@
+"""Reference corpus of resumes and job descriptions for benchmarks
+
+Documents are generated deterministically from a seed so results are
+comparable between commits. The repo's sample resume and job description
+are always included.
+"""
+import os
+import random
+from typing import Dict, List
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Document sizes in paragraphs
+SIZES = {"small": 4, "medium": 12, "large": 40}
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C++", "SQL",
+    "React", "Angular", "Vue", "Node.js", "Django", "Flask", "FastAPI", "Spring",
+    "PostgreSQL", "MongoDB", "Redis", "Elasticsearch", "Kafka", "Spark", "Airflow",
+    "Docker", "Kubernetes", "AWS", "Azure", "GCP", "Terraform", "Jenkins", "CI/CD",
+    "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "NumPy", "Machine Learning",
+    "Deep Learning", "NLP", "Computer Vision", "GraphQL", "REST API", "Microservices",
+    "Git", "Linux", "Bash", "Agile", "Scrum", "Tableau", "Grafana", "Jest", "Pytest",
+    "K8s", "Postgres", "Golang", "sklearn"
+]
+
+RESUME_SENTENCES = [
+    "Built and maintained {a} services handling millions of requests per day.",
+    "Led a team of four engineers migrating legacy systems to {a} and {b}.",
+    "{n}+ years of experience with {a} and {b} in production environments.",
+    "Designed data pipelines using {a}, reducing processing time by {p}%.",
+    "Implemented monitoring and alerting with {a}, improving uptime to 99.9%.",
+    "Mentored junior developers on {a} best practices and code review.",
+    "Automated deployments with {a} and {b}, cutting release time in half.",
+    "Collaborated with product and design to ship features built on {a}.",
+]
+
+JD_SENTENCES = [
+    "Required: {n}+ years of experience with {a}.",
+    "Must have strong knowledge of {a} and {b}.",
+    "Experience with {a} is preferred.",
+    "Familiarity with {a} is a plus.",
+    "You will design and build systems using {a} and {b}.",
+    "Nice to have: exposure to {a}.",
+    "Work closely with the team to deliver {a} solutions at scale.",
+    "Strong communication skills and ownership of {a} projects.",
+]
+
+
+def _paragraph(rng: random.Random, templates: List[str], sentences: int = 4) -> str:
+    lines = []
+    for _ in range(sentences):
+        a, b = rng.sample(SKILLS, 2)
+        lines.append(rng.choice(templates).format(a=a, b=b, n=rng.randint(1, 8), p=rng.randint(10, 70)))
+    return " ".join(lines)
+
+
+def generate_document(kind: str, size: str, seed: int) -> str:
+    """Generate a resume or job description with SIZES[size] paragraphs"""
+    rng = random.Random(f"{kind}-{size}-{seed}")
+    templates = RESUME_SENTENCES if kind == "resume" else JD_SENTENCES
+    header = "PROFESSIONAL EXPERIENCE" if kind == "resume" else "REQUIREMENTS"
+    paragraphs = [header] + [_paragraph(rng, templates) for _ in range(SIZES[size])]
+    return "\n\n".join(paragraphs)
+
+
+def _read_sample(name: str) -> str:
+    path = os.path.join(REPO_ROOT, name)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return ""
+
+
+def load_corpus(documents_per_size: int = 5, seed: int = 42) -> Dict[str, List[Dict[str, str]]]:
+    """Resume/JD pairs grouped by size, plus the repo samples"""
+    corpus = {}
+    for size in SIZES:
+        corpus[size] = [
+            {
+                "resume": generate_document("resume", size, seed + i),
+                "job_description": generate_document("jd", size, seed + i)
+            }
+            for i in range(documents_per_size)
+        ]
+
+    sample = {
+        "resume": _read_sample("sample-resume.txt"),
+        "job_description": _read_sample("sample-job-description.txt")
+    }
+    if sample["resume"] and sample["job_description"]:
+        corpus["sample"] = [sample]
+    return corpus
+
+
+def write_pdf(path: str, text: str):
+    """Write a minimal single-font PDF containing text (no extra dependencies)"""
+    lines = []
+    for paragraph in text.split("\n"):
+        while len(paragraph) > 90:
+            cut = paragraph.rfind(" ", 0, 90)
+            cut = cut if cut > 0 else 90
+            lines.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        lines.append(paragraph)
+
+    def escape(line: str) -> str:
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    pages = [lines[i:i + 50] for i in range(0, len(lines), 50)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 50 780 Td 14 TL " + " ".join(f"({escape(l)}) '" for l in page_lines) + " ET"
+        objects.append(f"<< /Length {len(content.encode('latin-1', 'replace'))} >>\nstream\n{content}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def write_docx(path: str, text: str):
+    """Write a DOCX file with one paragraph per line"""
+    from docx import Document
+    document = Document()
+    for paragraph in text.split("\n"):
+        document.add_paragraph(paragraph)
+    document.save(path)
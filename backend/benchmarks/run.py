@@ -0,0 +1,239 @@
+"""Benchmark harness for the analysis pipeline
+
+Times each pipeline stage over a reference corpus and writes the results
+as JSON so runs can be compared between commits. Runs fully offline: the
+LLM client is replaced by a stub and nothing touches MongoDB.
+
+Usage (from backend/):
+    python -m benchmarks.run
+    python -m benchmarks.run --docs 10 --repeat 5 --output results.json
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Keep the run offline and unthrottled before the app reads its settings
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["OPENAI_API_KEY"] = ""
+os.environ.setdefault("LLM_RATE_LIMIT_PER_MINUTE", "1000000")
+os.environ.setdefault("LLM_RATE_LIMIT_BURST", "1000000")
+
+from benchmarks.corpus import load_corpus, write_pdf, write_docx  # noqa: E402
+from benchmarks.stats import git_commit, summarize  # noqa: E402
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+class StubLLMClient:
+    """Stands in for the Gemini client with a fixed latency"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate_content(self, prompt: str):
+        if self.latency:
+            time.sleep(self.latency)
+
+        class Response:
+            text = "1. Highlight relevant experience\n2. Add missing keywords\n3. Expand the skills section"
+        return Response()
+
+
+def measure(fn: Callable, inputs: List, repeat: int, before_each: Optional[Callable] = None) -> Dict:
+    """Time fn over every input `repeat` times, then measure peak memory in one extra pass"""
+    latencies = []
+    for _ in range(repeat):
+        for item in inputs:
+            if before_each:
+                before_each()
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+
+    # Separate pass so tracing overhead doesn't skew latencies
+    tracemalloc.start()
+    for item in inputs:
+        if before_each:
+            before_each()
+        fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        **summarize(latencies),
+        "throughput_per_s": round(len(latencies) / total, 2) if total else None,
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(docs: int, repeat: int, llm_latency: float, seed: int) -> Dict:
+    from app.services.nlp_service import nlp_service
+    from app.services.analysis_service import analysis_service
+    from app.services.file_service import file_service
+    from app.services.llm_service import llm_service
+
+    llm_service.client = StubLLMClient(llm_latency)
+    llm_service.use_gemini = True
+
+    loop = asyncio.new_event_loop()
+    corpus = load_corpus(docs, seed)
+    results: Dict[str, Dict] = {}
+
+    def run(coro):
+        return loop.run_until_complete(coro)
+
+    for size, pairs in corpus.items():
+        print(f"Benchmarking {size} documents ({len(pairs)} pairs)...")
+        texts = [p["resume"] for p in pairs] + [p["job_description"] for p in pairs]
+        skill_names = [
+            (
+                [s["name"] for s in nlp_service.extract_skills_from_text(p["resume"])],
+                [s["name"] for s in nlp_service.extract_skills_from_text(p["job_description"])]
+            )
+            for p in pairs
+        ]
+        skill_sets = [
+            (nlp_service.extract_skill_set(p["resume"]), nlp_service.extract_skill_set(p["job_description"]))
+            for p in pairs
+        ]
+
+        stages = {
+            "extract_skills_from_text": measure(nlp_service.extract_skills_from_text, texts, repeat),
+            "compute_skill_match": measure(lambda s: nlp_service.compute_skill_match(*s), skill_names, repeat),
+            "match_skill_sets": measure(lambda s: nlp_service.match_skill_sets(*s), skill_sets, repeat),
+            "compute_semantic_similarity": measure(
+                lambda p: nlp_service.compute_semantic_similarity(p["resume"], p["job_description"]), pairs, repeat
+            ),
+            "identify_weak_skills": measure(
+                lambda s: analysis_service._identify_weak_skills(*s), skill_sets, repeat
+            ),
+            "analyze_cold": measure(
+                lambda p: run(analysis_service.analyze(p["resume"], p["job_description"])),
+                pairs, repeat, before_each=analysis_service.clear_caches
+            ),
+            "analyze_warm": measure(
+                lambda p: run(analysis_service.analyze(p["resume"], p["job_description"])), pairs, repeat
+            ),
+            "resume_suggestions_stub_llm": measure(
+                lambda p: run(llm_service.generate_resume_rewrite_suggestions(["Docker", "Kubernetes", "AWS"])),
+                pairs, repeat
+            ),
+        }
+
+        # File extraction
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_paths, docx_paths = [], []
+            for i, pair in enumerate(pairs):
+                pdf_paths.append(os.path.join(tmp, f"resume_{i}.pdf"))
+                write_pdf(pdf_paths[-1], pair["resume"])
+                try:
+                    docx_paths.append(os.path.join(tmp, f"resume_{i}.docx"))
+                    write_docx(docx_paths[-1], pair["resume"])
+                except Exception as e:
+                    print(f"Skipping DOCX benchmark: {e}")
+                    docx_paths = []
+                    break
+
+            stages["file_extract_pdf"] = measure(
+                lambda path: run(file_service.extract_text_from_file(path)), pdf_paths, repeat
+            )
+            if docx_paths:
+                stages["file_extract_docx"] = measure(
+                    lambda path: run(file_service.extract_text_from_file(path)), docx_paths, repeat
+                )
+
+        results[size] = {
+            "documents": len(pairs),
+            "avg_resume_chars": sum(len(p["resume"]) for p in pairs) // len(pairs),
+            "avg_job_description_chars": sum(len(p["job_description"]) for p in pairs) // len(pairs),
+            "stages": stages
+        }
+
+    loop.close()
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float):
+    """Print p50/p95 changes against a baseline run and return regressions"""
+    regressions = []
+    print(f"\n{'size/stage':<45} {'p50 ms':>18} {'p95 ms':>18}")
+    for size, data in current["results"].items():
+        base_stages = baseline.get("results", {}).get(size, {}).get("stages", {})
+        for stage, stats in data["stages"].items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms"):
+                change = (stats[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+                cells.append(f"{base[key]:.2f}->{stats[key]:.2f} ({change:+.0f}%)")
+                if key == "p50_ms" and change > threshold:
+                    regressions.append(f"{size}/{stage}")
+            print(f"{size + '/' + stage:<45} {cells[0]:>18} {cells[1]:>18}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline")
+    parser.add_argument("--docs", type=int, default=5, help="Generated documents per size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over each input")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stub LLM latency in seconds")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p50 regression threshold in percent")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "docs": args.docs,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "llm_latency": args.llm_latency
+        },
+        "results": run_benchmarks(args.docs, args.repeat, args.llm_latency, args.seed)
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['commit'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    for size, data in report["results"].items():
+        print(f"\n[{size}]")
+        for stage, stats in data["stages"].items():
+            print(
+                f"  {stage:<32} p50 {stats['p50_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms  "
+                f"p99 {stats['p99_ms']:>9.2f} ms  {stats['throughput_per_s'] or 0:>9.1f}/s  "
+                f"peak {stats['peak_memory_kb']:>8.1f} KB"
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\nRegressions over {args.threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
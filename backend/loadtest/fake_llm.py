@@ -0,0 +1,75 @@
+"""OpenAI-compatible stand-in LLM server with configurable latency
+
+Serves POST /v1/chat/completions so the app can be pointed at it with
+OPENAI_BASE_URL. Can also be run on its own:
+
+    python -m loadtest.fake_llm --port 8099 --latency 0.8 --jitter 0.3
+"""
+import time
+import random
+import asyncio
+import argparse
+from fastapi import FastAPI, Request
+
+
+def create_app(latency: float = 0.5, jitter: float = 0.0, error_rate: float = 0.0) -> FastAPI:
+    """Build the fake LLM app"""
+    app = FastAPI(title="Fake LLM")
+    app.state.calls = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+        if error_rate and random.random() < error_rate:
+            from fastapi.responses import JSONResponse
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}
+            )
+
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        return {
+            "id": f"chatcmpl-fake-{app.state.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": "1. Highlight relevant projects.\n2. Add missing keywords.\n3. Quantify your impact."
+                },
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": 20,
+                "total_tokens": len(prompt) // 4 + 20
+            }
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency, args.jitter, args.error_rate), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
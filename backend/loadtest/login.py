@@ -0,0 +1,209 @@
+"""Login-burst benchmark
+
+Registers a pool of accounts, then fires bursts of concurrent logins
+while a probe client keeps polling a cheap endpoint. Reports login
+latency and throughput alongside the probe's latency before and during
+the burst, which shows whether password hashing is stalling the event
+loop for everyone else on the worker.
+
+Uses the same local stand-ins as loadtest.run. Requires httpx. Usage
+(from backend/):
+    python -m loadtest.login
+    python -m loadtest.login --users 50 --burst 200 --rounds 12 --output login.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.stats import git_commit, summarize
+from loadtest.run import BACKEND_DIR, start_mongod, stop, wait_for
+
+
+PASSWORD = "login-bench-password"
+
+
+async def probe(client, path: str, stop_event: asyncio.Event, interval: float) -> List[float]:
+    """Poll path until stop_event is set, returning latencies"""
+    latencies = []
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+        except Exception:
+            pass  # A timed-out probe shows up as a gap in the samples
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(base_url: str, users: int, burst: int, concurrency: int, probe_path: str,
+              probe_interval: float, baseline_seconds: float) -> Dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client, \
+            httpx.AsyncClient(base_url=base_url, timeout=30.0) as probe_client:
+        prefix = uuid.uuid4().hex[:8]
+        emails = []
+        for i in range(users):
+            email = f"login-{prefix}-{i}@example.com"
+            response = await client.post("/api/auth/register", json={
+                "email": email, "username": f"login-{prefix}-{i}", "password": PASSWORD
+            })
+            if response.status_code != 201:
+                sys.exit(f"Registering {email} failed: {response.status_code} {response.text}")
+            emails.append(email)
+
+        # Probe latency with no logins in flight
+        stop_event = asyncio.Event()
+        baseline_task = asyncio.create_task(probe(probe_client, probe_path, stop_event, probe_interval))
+        await asyncio.sleep(baseline_seconds)
+        stop_event.set()
+        baseline = await baseline_task
+
+        # Probe latency while the burst runs
+        stop_event = asyncio.Event()
+        during_task = asyncio.create_task(probe(probe_client, probe_path, stop_event, probe_interval))
+        slots = asyncio.Semaphore(concurrency)
+        login_latencies: List[float] = []
+        errors = 0
+
+        async def login(i: int):
+            nonlocal errors
+            async with slots:
+                start = time.perf_counter()
+                response = await client.post("/api/auth/login", json={
+                    "email": emails[i % len(emails)], "password": PASSWORD
+                })
+                login_latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(burst)))
+        elapsed = time.perf_counter() - started
+        stop_event.set()
+        during = await during_task
+
+    return {
+        "logins": {
+            **summarize(login_latencies),
+            "errors": errors,
+            "throughput_per_s": round(burst / elapsed, 2) if elapsed else None,
+            "duration_s": round(elapsed, 2)
+        },
+        "probe_baseline": summarize(baseline),
+        "probe_during_burst": summarize(during)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure login throughput and API responsiveness during a login burst")
+    parser.add_argument("--users", type=int, default=20, help="Accounts to register")
+    parser.add_argument("--burst", type=int, default=100, help="Logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight at once")
+    parser.add_argument("--rounds", type=int, help="bcrypt cost (PASSWORD_HASH_ROUNDS)")
+    parser.add_argument("--hash-workers", type=int, help="Concurrent hashes (PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--probe-path", default="/health", help="Endpoint polled during the burst")
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    parser.add_argument("--baseline", type=float, default=3.0, help="Seconds of probing before the burst")
+    parser.add_argument("--port", type=int, default=8011, help="App port")
+    parser.add_argument("--mongo", default="memory", help="memory, mongod, or a MongoDB URI")
+    parser.add_argument("--mongo-port", type=int, default=27098)
+    parser.add_argument("--output", help="Result JSON path")
+    args = parser.parse_args()
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        sys.exit("The login benchmark needs httpx: pip install httpx")
+
+    mongod = None
+    dbpath = None
+    if args.mongo == "memory":
+        mongo_uri = "mongomock://"
+    elif args.mongo == "mongod":
+        mongod, mongo_uri, dbpath = start_mongod(args.mongo_port)
+    else:
+        mongo_uri = args.mongo
+
+    env = {
+        **os.environ,
+        "MONGODB_URI": mongo_uri,
+        "DATABASE_NAME": f"loginbench_{uuid.uuid4().hex[:8]}",
+        "USE_GEMINI": "false",
+        "GEMINI_API_KEY": "",
+        "OPENAI_API_KEY": "",
+    }
+    if args.rounds:
+        env["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    if args.hash_workers:
+        env["PASSWORD_HASH_WORKERS"] = str(args.hash_workers)
+
+    app = None
+    try:
+        app = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        wait_for(f"{base_url}/health", 300, app)
+
+        print(f"Registering {args.users} users, then {args.burst} logins at concurrency {args.concurrency}...")
+        result = asyncio.run(run(
+            base_url, args.users, args.burst, args.concurrency,
+            args.probe_path, args.probe_interval, args.baseline
+        ))
+    finally:
+        stop(app)
+        stop(mongod)
+        if dbpath:
+            shutil.rmtree(dbpath, ignore_errors=True)
+
+    logins = result["logins"]
+    print(
+        f"  logins   n={logins['count']:<5} {logins['throughput_per_s']}/s  p50 {logins['p50_ms']:.1f} ms  "
+        f"p95 {logins['p95_ms']:.1f} ms  errors {logins['errors']}"
+    )
+    for label, key in (("baseline", "probe_baseline"), ("burst", "probe_during_burst")):
+        stats = result[key]
+        if not stats.get("count"):
+            print(f"  {args.probe_path} {label:<8} no successful probes")
+            continue
+        print(
+            f"  {args.probe_path} {label:<8} n={stats['count']:<5} p50 {stats['p50_ms']:.1f} ms  "
+            f"p95 {stats['p95_ms']:.1f} ms  p99 {stats['p99_ms']:.1f} ms"
+        )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "mongo": args.mongo if args.mongo in ("memory", "mongod") else "uri",
+            "users": args.users,
+            "burst": args.burst,
+            "concurrency": args.concurrency,
+            "rounds": args.rounds,
+            "hash_workers": args.hash_workers,
+            "probe_path": args.probe_path
+        },
+        **result
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""HTTP load-test harness for the API
+
+Starts the app under uvicorn against a local database and a fake
+OpenAI-compatible LLM server, then drives a weighted mix of requests at
+increasing concurrency and reports per-endpoint latency percentiles,
+throughput and error rate. Nothing leaves the machine.
+
+Database options (--mongo):
+    memory   in-process mongomock (needs mongomock-motor, single worker only)
+    mongod   throwaway local mongod on a temp dbpath (needs mongod on PATH)
+    <uri>    any existing MongoDB URI
+
+Requires httpx. Usage (from backend/):
+    python -m loadtest.run
+    python -m loadtest.run --concurrency 1,8,32 --duration 30 --llm-latency 0.8
+    python -m loadtest.run --mongo mongod --workers 2 --output loadtest.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from benchmarks.corpus import load_corpus
+from benchmarks.stats import git_commit, summarize
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scenario name -> relative weight in the request mix
+SCENARIOS = {
+    "analyze": 2,
+    "chat_message": 3,
+    "chat_history": 2,
+    "analysis_history": 2,
+    "progress_create": 1,
+    "progress_list": 2,
+}
+
+
+class Recorder:
+    """Collects latencies and errors per scenario"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, name: str, latency: float, ok: bool):
+        self.latencies.setdefault(name, []).append(latency)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed: float) -> Dict:
+        report = {}
+        for name, latencies in sorted(self.latencies.items()):
+            errors = self.errors.get(name, 0)
+            report[name] = {
+                **summarize(latencies),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4),
+                "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else None
+            }
+        return report
+
+
+class VirtualUser:
+    """One simulated client with its own account and chat session"""
+
+    def __init__(self, client, corpus: List[Dict], rng: random.Random):
+        self.client = client
+        self.corpus = corpus
+        self.rng = rng
+        self.user_id = f"load-{uuid.uuid4().hex[:12]}"
+        self.session_id = uuid.uuid4().hex[:8]
+        self.headers: Dict[str, str] = {}
+
+    async def login(self, recorder: Recorder):
+        """Register and log in so chat sessions are per user"""
+        email = f"{self.user_id}@example.com"
+        password = "load-test-password"
+        start = time.perf_counter()
+        response = await self.client.post("/api/auth/register", json={
+            "email": email, "username": self.user_id, "password": password
+        })
+        recorder.add("auth_register", time.perf_counter() - start, response.status_code == 201)
+
+        start = time.perf_counter()
+        response = await self.client.post("/api/auth/login", json={"email": email, "password": password})
+        recorder.add("auth_login", time.perf_counter() - start, response.status_code == 200)
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def analyze(self) -> bool:
+        """Stream an analysis and wait for the final SSE event"""
+        pair = self.rng.choice(self.corpus)
+        data = {"resume_text": pair["resume"], "job_description": pair["job_description"]}
+        async with self.client.stream("POST", "/api/analysis/analyze", data=data) as response:
+            if response.status_code != 200:
+                return False
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[6:])
+                if "error" in event:
+                    return False
+                if "result" in event:
+                    return True
+        return False
+
+    async def chat_message(self) -> bool:
+        response = await self.client.post("/api/chat/message", headers=self.headers, json={
+            "message": self.rng.choice([
+                "How should I prepare for a backend interview?",
+                "What should I learn after Python?",
+                "How do I show Kubernetes experience on my resume?",
+            ]),
+            "session_id": self.session_id
+        })
+        return response.status_code == 200
+
+    async def chat_history(self) -> bool:
+        response = await self.client.get(
+            "/api/chat/history", headers=self.headers, params={"session_id": self.session_id}
+        )
+        return response.status_code == 200
+
+    async def analysis_history(self) -> bool:
+        response = await self.client.get("/api/analysis/history", params={"limit": 10})
+        return response.status_code == 200
+
+    async def progress_create(self) -> bool:
+        response = await self.client.post("/api/progress/", params={
+            "user_id": self.user_id,
+            "skill": self.rng.choice(["python", "docker", "kubernetes", "react", "sql"])
+        })
+        return response.status_code == 200
+
+    async def progress_list(self) -> bool:
+        response = await self.client.get(f"/api/progress/{self.user_id}")
+        return response.status_code == 200
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, corpus: List[Dict], seed: int) -> Dict:
+    """Run the request mix with `concurrency` virtual users for `duration` seconds"""
+    import httpx
+
+    recorder = Recorder()
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name] for name in names]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        users = [VirtualUser(client, corpus, random.Random(seed + i)) for i in range(concurrency)]
+        await asyncio.gather(*(user.login(recorder) for user in users))
+
+        deadline = time.perf_counter() + duration
+
+        async def drive(user: VirtualUser):
+            while time.perf_counter() < deadline:
+                name = user.rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                try:
+                    ok = await getattr(user, name)()
+                except Exception:
+                    ok = False
+                recorder.add(name, time.perf_counter() - start, ok)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drive(user) for user in users))
+        elapsed = time.perf_counter() - started
+
+    endpoints = recorder.report(elapsed)
+    total = sum(len(v) for k, v in recorder.latencies.items() if k in SCENARIOS)
+    errors = sum(v for k, v in recorder.errors.items() if k in SCENARIOS)
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_per_s": round(total / elapsed, 2) if elapsed else None,
+        "error_rate": round(errors / total, 4) if total else None,
+        "endpoints": endpoints
+    }
+
+
+def start_mongod(port: int):
+    """Launch a throwaway mongod, returning (process, uri, dbpath)"""
+    binary = shutil.which("mongod")
+    if not binary:
+        sys.exit("mongod not found on PATH; use --mongo memory or pass a MongoDB URI")
+    dbpath = tempfile.mkdtemp(prefix="loadtest-mongo-")
+    process = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return process, f"mongodb://127.0.0.1:{port}", dbpath
+
+
+def wait_for(url: str, timeout: float, process: Optional[subprocess.Popen] = None):
+    """Poll url until it answers 200"""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            sys.exit(f"Process serving {url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    sys.exit(f"Timed out waiting for {url}")
+
+
+def stop(process: Optional[subprocess.Popen]):
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against local stand-ins")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency level")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8010, help="App port")
+    parser.add_argument("--llm-port", type=int, default=8099)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--mongo", default="memory", help="memory, mongod, or a MongoDB URI")
+    parser.add_argument("--mongo-port", type=int, default=27099)
+    parser.add_argument("--docs", type=int, default=5, help="Generated documents per size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Result JSON path")
+    args = parser.parse_args()
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        sys.exit("The load-test harness needs httpx: pip install httpx")
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    corpus = [pair for pairs in load_corpus(args.docs, args.seed).values() for pair in pairs]
+
+    mongod = None
+    dbpath = None
+    if args.mongo == "memory":
+        if args.workers > 1:
+            sys.exit("--mongo memory keeps data per process; use --workers 1 or a real mongod")
+        mongo_uri = "mongomock://"
+    elif args.mongo == "mongod":
+        mongod, mongo_uri, dbpath = start_mongod(args.mongo_port)
+    else:
+        mongo_uri = args.mongo
+
+    env = {
+        **os.environ,
+        "MONGODB_URI": mongo_uri,
+        "DATABASE_NAME": f"loadtest_{uuid.uuid4().hex[:8]}",
+        "USE_GEMINI": "false",
+        "GEMINI_API_KEY": "",
+        "OPENAI_API_KEY": "loadtest",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1",
+        # The fake LLM is the thing under test's dependency, not a paid API
+        "LLM_RATE_LIMIT_PER_MINUTE": os.environ.get("LLM_RATE_LIMIT_PER_MINUTE", "1000000"),
+        "LLM_RATE_LIMIT_BURST": os.environ.get("LLM_RATE_LIMIT_BURST", "1000000"),
+    }
+
+    llm = subprocess.Popen(
+        [sys.executable, "-m", "loadtest.fake_llm", "--port", str(args.llm_port),
+         "--latency", str(args.llm_latency), "--jitter", str(args.llm_jitter),
+         "--error-rate", str(args.llm_error_rate)],
+        cwd=BACKEND_DIR
+    )
+    app = None
+    try:
+        wait_for(f"http://127.0.0.1:{args.llm_port}/stats", 30, llm)
+
+        app = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        # Model loading on startup can take a while
+        wait_for(f"{base_url}/health", 300, app)
+
+        results = []
+        for concurrency in levels:
+            print(f"Running {concurrency} concurrent users for {args.duration}s...")
+            result = asyncio.run(run_level(base_url, concurrency, args.duration, corpus, args.seed))
+            results.append(result)
+            print(
+                f"  {result['requests']} requests, {result['throughput_per_s']}/s, "
+                f"error rate {result['error_rate']}"
+            )
+            for name, stats in result["endpoints"].items():
+                print(
+                    f"    {name:<18} n={stats['count']:<6} p50 {stats['p50_ms']:>9.1f} ms  "
+                    f"p95 {stats['p95_ms']:>9.1f} ms  p99 {stats['p99_ms']:>9.1f} ms  "
+                    f"errors {stats['error_rate']:.1%}"
+                )
+    finally:
+        stop(app)
+        stop(llm)
+        stop(mongod)
+        if dbpath:
+            shutil.rmtree(dbpath, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "mongo": args.mongo if args.mongo in ("memory", "mongod") else "uri",
+            "workers": args.workers,
+            "duration_s": args.duration,
+            "llm_latency": args.llm_latency,
+            "llm_jitter": args.llm_jitter,
+            "llm_error_rate": args.llm_error_rate
+        },
+        "levels": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
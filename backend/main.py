@@ -1,9 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.database import connect_to_mongo, close_mongo_connection
-from app.api import analysis, chat, progress, auth
+from app.api import analysis, chat, progress, auth, admin
+from app.middleware import CompressionMiddleware, MetricsMiddleware
+from app.serialization import FastJSONResponse
+from app.services.chat_session_service import chat_session_store
+from app.services.analysis_writer import analysis_writer
+from app.services.taxonomy_store import taxonomy_store
+from app.services.metrics import registry
 
 
 @asynccontextmanager
@@ -11,8 +18,14 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     await connect_to_mongo()
+    chat_session_store.start()
+    analysis_writer.start()
+    taxonomy_store.start()
     yield
     # Shutdown
+    await taxonomy_store.stop()
+    await analysis_writer.stop()
+    await chat_session_store.stop()
     await close_mongo_connection()
 
 
@@ -20,7 +33,8 @@ app = FastAPI(
     title="AI Skill Gap Analyzer",
     description="Analyze resume-job fit and provide personalized improvement suggestions",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -30,13 +44,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Chat-Client"],  # Anonymous chat client ID
 )
 
+# gzip/brotli for larger complete responses (SSE streams are left alone)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality
+)
+
+# Request latency metrics and tracing (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["Analysis"])
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(progress.router, prefix="/api/progress", tags=["Progress"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/")
@@ -51,31 +78,34 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint with database connectivity test"""
+    """Health check endpoint with cached database connectivity state"""
     health_status = {
         "status": "healthy",
         "service": "AI Skill Gap Analyzer API",
         "version": "1.0.0"
     }
     
-    # Test database connection
-    try:
-        from app.database import db
-        if db.client:
-            # Ping database
-            await db.client.admin.command('ping')
-            health_status["database"] = "connected"
-        else:
-            health_status["database"] = "not_initialized"
-            health_status["status"] = "degraded"
-    except Exception as e:
-        health_status["database"] = "error"
-        health_status["database_error"] = str(e)
+    # Cached database connectivity, refreshed in the background so probes don't hit the DB
+    from app.database import db
+    health_status.update(db.health)
+    if db.health["database"] == "not_initialized":
+        health_status["status"] = "degraded"
+    elif db.health["database"] == "error":
         health_status["status"] = "unhealthy"
     
+    # LLM provider state (in-memory, no upstream call)
+    from app.services.llm_service import llm_service
+    health_status["llm"] = llm_service.get_status()
+    
     return health_status
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,93 @@
+import os
+
+from app.services.importance import is_heading, score_importance
+from app.services.skill_taxonomy import SkillTaxonomy
+
+
+TAXONOMY = SkillTaxonomy.from_file(
+    os.path.join(os.path.dirname(__file__), "..", "app", "data", "skill_taxonomy.json")
+)
+SAMPLE_JOB_DESCRIPTION = os.path.join(
+    os.path.dirname(__file__), "..", "..", "sample-job-description.txt"
+)
+
+
+def test_short_non_skill_bullet_keeps_section_level():
+    job_description = """About the role
+We build developer tooling.
+
+Requirements:
+- Python
+- Strong communication
+- Docker and Kubernetes
+- PostgreSQL
+
+Nice to have
+- Go
+"""
+    importance = score_importance(
+        ["Python", "Docker", "Kubernetes", "PostgreSQL", "Go"], job_description, TAXONOMY
+    )
+
+    assert importance == {
+        "Python": "high",
+        "Docker": "high",
+        "Kubernetes": "high",
+        "PostgreSQL": "high",
+        "Go": "low",
+    }
+
+
+def test_headings():
+    assert is_heading("HIGHLY PREFERRED QUALIFICATIONS")
+    assert is_heading("TECHNICAL STACK YOU'LL USE")
+    assert is_heading("Highly preferred qualifications")
+    assert is_heading("Compensation & Benefits:")
+    assert not is_heading("• Strong understanding of Docker and Kubernetes")
+    assert not is_heading("- SQL")
+    assert not is_heading("Languages: Python (primary), SQL, potentially C++ or Rust for optimization")
+
+
+def test_sample_job_description_sections():
+    with open(SAMPLE_JOB_DESCRIPTION, encoding="utf-8") as f:
+        job_description = f.read()
+
+    importance = score_importance(
+        ["Python", "Docker", "Kubernetes", "Hadoop", "Kafka", "Rust", "Grafana", "Airflow"],
+        job_description,
+        TAXONOMY
+    )
+
+    # Required qualifications
+    assert importance["Python"] == "high"
+    assert importance["Docker"] == "high"
+    assert importance["Kubernetes"] == "high"
+    # Highly preferred qualifications
+    assert importance["Hadoop"] == "medium"
+    assert importance["Kafka"] == "medium"
+    # Technical stack, a section without an importance keyword
+    assert importance["Rust"] == "low"
+    assert importance["Grafana"] == "low"
+    assert importance["Airflow"] == "low"
+
+
+def test_aliases_count_as_mentions():
+    job_description = """Requirements:
+- Postgres and JS
+- k8s
+- Node JS
+
+Nice to have:
+- Experience with Go
+"""
+    importance = score_importance(
+        ["PostgreSQL", "JavaScript", "Kubernetes", "Node.Js", "Go"], job_description, TAXONOMY
+    )
+
+    assert importance == {
+        "PostgreSQL": "high",
+        "JavaScript": "high",
+        "Kubernetes": "high",
+        "Node.Js": "high",
+        "Go": "low",
+    }
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("beanie")
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from beanie import init_beanie  # noqa: E402
+
+from app.models import UserAnalysis, ResumeDocument, JobDescriptionDocument  # noqa: E402
+from app.services.analysis_writer import AnalysisWriter  # noqa: E402
+from app.services.document_store import document_store  # noqa: E402
+
+
+async def _init_db():
+    client = mongomock_motor.AsyncMongoMockClient()
+    await init_beanie(
+        database=client["analysis_writer_test"],
+        document_models=[UserAnalysis, ResumeDocument, JobDescriptionDocument]
+    )
+
+
+def _analysis(resume_text: str = "resume", job_description: str = "job") -> UserAnalysis:
+    return UserAnalysis(
+        user_id="user",
+        resume_hash=document_store.stage("resume", resume_text),
+        job_description_hash=document_store.stage("job_description", job_description),
+        analysis_result={}
+    )
+
+
+async def _fail(*args, **kwargs):
+    raise ConnectionError("mongo is down")
+
+
+def test_flush_writes_analyses_and_staged_texts():
+    async def scenario():
+        await _init_db()
+        writer = AnalysisWriter(batch_size=2, flush_interval=60, max_queue=10)
+        ids = [await writer.enqueue(_analysis(f"resume {i}")) for i in range(5)]
+        assert writer.get_pending(ids[0]) is not None
+
+        await writer.flush()
+
+        assert len(writer) == 0
+        assert await UserAnalysis.count() == 5
+        assert await ResumeDocument.count() == 5
+        assert await JobDescriptionDocument.count() == 1
+        stored = await writer.load(ids[3])
+        assert await document_store.get("resume", stored.resume_hash) == "resume 3"
+
+    asyncio.run(scenario())
+
+
+def test_failed_writes_stay_queued(monkeypatch):
+    async def scenario():
+        await _init_db()
+        writer = AnalysisWriter(batch_size=2, flush_interval=60, max_queue=10)
+        analysis_id = await writer.enqueue(_analysis("retried resume"))
+
+        monkeypatch.setattr(UserAnalysis, "insert_many", _fail)
+        await writer.flush()
+        assert len(writer) == 1
+        assert (await writer.load(analysis_id)).id == analysis_id
+
+        monkeypatch.undo()
+        await writer.flush()
+        assert len(writer) == 0
+        assert await UserAnalysis.get(analysis_id) is not None
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_drops_oldest_and_releases_its_texts(monkeypatch):
+    async def scenario():
+        await _init_db()
+        monkeypatch.setattr(UserAnalysis, "insert_many", _fail)
+        writer = AnalysisWriter(batch_size=1, flush_interval=60, max_queue=2)
+
+        oldest = _analysis("dropped resume", "dropped job")
+        await writer.enqueue(oldest)
+        await writer.enqueue(_analysis("second resume", "shared job"))
+        newest = await writer.enqueue(_analysis("newest resume", "shared job"))
+
+        assert writer.dropped == 1
+        assert len(writer) == 2
+        assert writer.get_pending(oldest.id) is None
+        assert writer.get_pending(newest) is not None
+        # The dropped analysis's texts are no longer held; shared ones still are
+        assert ("resume", oldest.resume_hash) not in document_store._staged
+        assert ("job_description", oldest.job_description_hash) not in document_store._staged
+        assert await document_store.get("job_description", writer.get_pending(newest).job_description_hash) == "shared job"
+
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+import asyncio
+import gzip
+
+from app.middleware import CompressionMiddleware
+
+
+def _app(body: bytes, headers=(), status: int = 200, chunks: int = 1):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+        size = len(body) // chunks
+        for i in range(chunks):
+            last = i == chunks - 1
+            part = body[i * size:] if last else body[i * size:(i + 1) * size]
+            await send({"type": "http.response.body", "body": part, "more_body": not last})
+    return app
+
+
+def _request(app, accept_encoding: str = "gzip"):
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    headers = {key: value for key, value in messages[0].get("headers", [])}
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return headers, body
+
+
+def test_large_body_is_gzipped_with_vary():
+    body = b"x" * 1000
+
+    headers, compressed = _request(_app(body, [(b"content-length", b"1000")]))
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert headers[b"content-length"] == str(len(compressed)).encode()
+    assert gzip.decompress(compressed) == body
+
+
+def test_small_body_passes_through():
+    headers, body = _request(_app(b"small"))
+
+    assert b"content-encoding" not in headers
+    assert body == b"small"
+
+
+def test_streamed_body_passes_through():
+    body = b"data: event\n\n" * 100
+
+    headers, received = _request(_app(body, chunks=4))
+
+    assert b"content-encoding" not in headers
+    assert received == body
+
+
+def test_not_modified_and_encoded_responses_pass_through():
+    headers, _ = _request(_app(b"", status=304))
+    assert b"content-encoding" not in headers
+
+    headers, body = _request(_app(b"y" * 1000, [(b"content-encoding", b"br")]))
+    assert headers[b"content-encoding"] == b"br"
+    assert body == b"y" * 1000
+
+
+def test_client_without_gzip_gets_identity():
+    headers, body = _request(_app(b"z" * 1000), accept_encoding="gzip;q=0, identity")
+
+    assert b"content-encoding" not in headers
+    assert body == b"z" * 1000
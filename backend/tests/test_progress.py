@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("beanie")
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from beanie import init_beanie  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+from app.models import UserAnalysis, UserProgress, ProgressBulkCreate  # noqa: E402
+from app.api.progress import create_progress, create_progress_bulk  # noqa: E402
+
+
+async def _init_db():
+    client = mongomock_motor.AsyncMongoMockClient()
+    await init_beanie(database=client["progress_test"], document_models=[UserAnalysis, UserProgress])
+
+
+def test_bulk_create_skips_tracked_and_repeated_skills():
+    async def scenario():
+        await _init_db()
+        await create_progress("user", "Docker")
+
+        created = await create_progress_bulk(ProgressBulkCreate(
+            user_id="user", skills=["Docker", " Kubernetes ", "Kubernetes", "", "docker"]
+        ))
+
+        # Names compare exactly, like the unique index
+        assert [progress.skill for progress in created] == ["Kubernetes", "docker"]
+        assert await UserProgress.find(UserProgress.user_id == "user").count() == 3
+
+    asyncio.run(scenario())
+
+
+def test_bulk_create_ignores_trackers_created_concurrently(monkeypatch):
+    async def scenario():
+        await _init_db()
+        await create_progress("user", "Docker")
+
+        # Another request inserts Docker after this one checked what was tracked
+        checked = []
+
+        async def nothing_tracked(self, *args, **kwargs):
+            checked.append(args)
+            return []
+
+        monkeypatch.setattr(type(UserProgress.get_motor_collection()), "distinct", nothing_tracked)
+
+        created = await create_progress_bulk(ProgressBulkCreate(user_id="user", skills=["Docker", "Go"]))
+
+        assert checked
+        assert [progress.skill for progress in created] == ["Go"]
+        assert await UserProgress.find(UserProgress.user_id == "user").count() == 2
+
+    asyncio.run(scenario())
+
+
+def test_single_create_rejects_tracked_skill():
+    async def scenario():
+        await _init_db()
+        await create_progress("user", "Docker")
+
+        with pytest.raises(HTTPException) as error:
+            await create_progress("user", "Docker")
+
+        assert error.value.status_code == 400
+
+    asyncio.run(scenario())
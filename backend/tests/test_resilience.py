@@ -0,0 +1,76 @@
+import asyncio
+
+from app.services.resilience import CircuitBreaker, TokenBucket
+
+
+def test_token_bucket_limits_to_capacity():
+    bucket = TokenBucket(rate_per_minute=0, capacity=2)
+
+    results = [asyncio.run(bucket.acquire()) for _ in range(3)]
+
+    assert results == [True, True, False]
+
+
+def test_token_bucket_waits_up_to_max_wait():
+    bucket = TokenBucket(rate_per_minute=60 * 100, capacity=1)  # One token per 10 ms
+    assert asyncio.run(bucket.acquire())
+
+    assert not asyncio.run(bucket.acquire(max_wait=0.0))
+    assert asyncio.run(bucket.acquire(max_wait=0.5))
+
+
+def _open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(window=4, failure_ratio=0.5, min_calls=2, **kwargs)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(0.1, success=False)
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_breaker_opens_on_failures_and_rejects_during_cooldown():
+    breaker = _open_breaker(cooldown=60)
+
+    assert not breaker.allow()
+
+
+def test_breaker_counts_slow_calls_as_failures():
+    breaker = CircuitBreaker(window=4, failure_ratio=0.5, min_calls=2, slow_call_seconds=1.0)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(2.0, success=True)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = _open_breaker(cooldown=0)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(0.1, success=True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = _open_breaker(cooldown=0)
+    assert breaker.allow()
+
+    breaker.record(0.1, success=False)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_release_returns_the_probe_slot():
+    breaker = _open_breaker(cooldown=0)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # The probe was cancelled before reaching the provider
+    breaker.release()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
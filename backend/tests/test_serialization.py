@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("starlette")
+pytest.importorskip("bson")
+
+from starlette.requests import Request  # noqa: E402
+
+from app.serialization import cache_headers, etag_matches, make_etag, not_modified  # noqa: E402
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag("user", "id1:2024-01-01")
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("user", "id1:2024-01-01")
+    assert etag != make_etag("user", "id1:2024-01-02")
+
+
+def test_etag_matches():
+    etag = make_etag("a")
+
+    assert etag_matches(_request(etag), etag)
+    assert etag_matches(_request(etag[2:]), etag)  # Strong form of the same tag
+    assert etag_matches(_request(f'W/"other", {etag}'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('W/"other"'), etag)
+    assert not etag_matches(_request(), etag)
+
+
+def test_not_modified():
+    etag = make_etag("a")
+
+    response = not_modified(etag)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+    assert cache_headers(etag)["Cache-Control"] == "private, no-cache"
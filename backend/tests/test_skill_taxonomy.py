@@ -0,0 +1,79 @@
+import numpy as np
+
+from app.services.skill_taxonomy import SkillTaxonomy, compact_key
+from app.services.skill_vocabulary import SkillVocabulary
+
+
+TAXONOMY_DATA = {
+    "version": "test",
+    "skills": [
+        {"name": "PostgreSQL", "category": "Database", "aliases": ["postgres"]},
+        {"name": "Kubernetes", "category": "DevOps", "aliases": ["k8s"]},
+        {"name": "Node.js", "category": "Backend", "aliases": ["nodejs"]},
+        {"name": "Machine Learning", "category": "AI"},
+        {"name": "Python", "category": "Language"},
+        {"name": "CI/CD", "category": "DevOps"},
+    ],
+    "excluded_words": ["Team"],
+}
+
+
+def test_compact_key():
+    assert compact_key("Node JS") == compact_key("node.js") == "nodejs"
+
+
+def test_aliases_and_spelling_variants_resolve_to_canonical_skill():
+    taxonomy = SkillTaxonomy(TAXONOMY_DATA)
+
+    assert taxonomy.canonicalize("Postgres") == "postgresql"
+    assert taxonomy.canonicalize("K8S") == "kubernetes"
+    assert taxonomy.canonicalize("Node JS") == "node.js"
+    assert taxonomy.canonicalize("nodejs") == "node.js"
+    assert taxonomy.canonicalize("Cobol") is None
+
+
+def test_find_skills_prefers_longest_match_and_dedupes():
+    taxonomy = SkillTaxonomy(TAXONOMY_DATA)
+
+    found = taxonomy.find_skills("Machine learning with Python, python and k8s; CI/CD pipelines")
+
+    assert found == ["machine learning", "python", "kubernetes", "ci/cd"]
+
+
+def test_find_mentions_reports_offsets():
+    taxonomy = SkillTaxonomy(TAXONOMY_DATA)
+    text = "we use postgres and node js"
+
+    mentions = taxonomy.find_mentions(text)
+
+    assert mentions == [(text.index("postgres"), "postgresql"), (text.index("node"), "node.js")]
+
+
+def test_vocabulary_encode_and_bits():
+    vocabulary = SkillVocabulary(["python", "docker", "kubernetes"], {"python": "Language"})
+
+    skill_set = vocabulary.encode(["Docker", "python", "unknown"], {"python": 5})
+
+    assert [vocabulary.names[i] for i in skill_set.ids] == ["docker", "python"]
+    assert skill_set.levels.tolist() == [0.0, 5.0]
+    assert SkillVocabulary.from_bits(skill_set.bits) == skill_set.ids.tolist()
+    assert vocabulary.categories[vocabulary.get_id("Python")] == "Language"
+
+
+def test_vocabulary_union_keeps_highest_level():
+    vocabulary = SkillVocabulary(["python", "docker", "kubernetes"])
+    first = vocabulary.encode(["python", "docker"], {"python": 2})
+    second = vocabulary.encode(["python", "kubernetes"], {"python": 4})
+
+    combined = vocabulary.union([first, second])
+
+    assert combined.bits == first.bits | second.bits
+    assert dict(zip(combined.ids.tolist(), combined.levels.tolist()))[vocabulary.get_id("python")] == 4.0
+    assert len(combined) == 3
+    assert len(vocabulary.union([])) == 0
+
+
+def test_bitset_round_trip():
+    ids = np.array([0, 3, 64, 130], dtype=np.int32)
+
+    assert SkillVocabulary.from_bits(SkillVocabulary.to_bits(ids)) == ids.tolist()
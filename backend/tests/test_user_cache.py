@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("beanie")
+pytest.importorskip("jose")
+pytest.importorskip("passlib")
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from beanie import init_beanie  # noqa: E402
+
+from app.models import User  # noqa: E402
+from app.services.user_cache import UserCache  # noqa: E402
+
+
+def _user() -> User:
+    async def create():
+        client = mongomock_motor.AsyncMongoMockClient()
+        await init_beanie(database=client["user_cache_test"], document_models=[User])
+        user = User(email="ada@example.com", username="ada", hashed_password="x", full_name="Ada")
+        await user.insert()
+        return user
+
+    return asyncio.run(create())
+
+
+def test_cached_user_is_a_copy():
+    cache = UserCache(ttl=60)
+    user = _user()
+    cache.put_user(user)
+
+    # Changing the stored or the returned instance leaves the cached one alone
+    user.full_name = "Changed before lookup"
+    first = cache.get_user(str(user.id))
+    first.full_name = "Changed by a request"
+    second = cache.get_user(str(user.id))
+
+    assert first is not second
+    assert second.full_name == "Ada"
+
+
+def test_invalidate_and_expiry():
+    user = _user()
+
+    cache = UserCache(ttl=60)
+    cache.put_user(user)
+    cache.invalidate_user(user.id)
+    assert cache.get_user(str(user.id)) is None
+
+    expired = UserCache(ttl=-1)
+    expired.put_user(user)
+    assert expired.get_user(str(user.id)) is None
+
+
+def test_lru_bound():
+    cache = UserCache(max_entries=1, ttl=60)
+    first, second = _user(), _user()
+
+    cache.put_user(first)
+    cache.put_user(second)
+
+    assert cache.get_user(str(first.id)) is None
+    assert cache.get_user(str(second.id)).id == second.id
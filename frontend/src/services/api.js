@@ -9,6 +9,25 @@ const api = axios.create({
   },
 });
 
+// Anonymous chat sessions are tied to a client ID the server hands out
+const CHAT_CLIENT_KEY = 'chatClientId';
+
+api.interceptors.request.use((config) => {
+  const clientId = localStorage.getItem(CHAT_CLIENT_KEY);
+  if (clientId) {
+    config.headers['X-Chat-Client'] = clientId;
+  }
+  return config;
+});
+
+api.interceptors.response.use((response) => {
+  const clientId = response.headers['x-chat-client'];
+  if (clientId) {
+    localStorage.setItem(CHAT_CLIENT_KEY, clientId);
+  }
+  return response;
+});
+
 // Analysis API
 export const analyzeResume = async (formData) => {
   const response = await api.post('/api/analysis/analyze', formData, {
@@ -19,9 +38,10 @@ export const analyzeResume = async (formData) => {
   return response.data;
 };
 
-export const getAnalysisHistory = async (limit = 10, skip = 0) => {
+export const getAnalysisHistory = async (limit = 10, cursor = null) => {
+  // Pass the previous page's next_cursor to fetch the following page
   const response = await api.get('/api/analysis/history', {
-    params: { limit, skip },
+    params: cursor ? { limit, cursor } : { limit },
   });
   return response.data;
 };
@@ -74,6 +94,23 @@ export const updateProgress = async (progressId, data) => {
   return response.data;
 };
 
+export const createProgressBulk = async (data) => {
+  // data: { user_id, skills?, analysis_id?, target_level? }
+  const response = await api.post('/api/progress/bulk', data);
+  return response.data;
+};
+
+export const updateProgressBulk = async (updates) => {
+  // updates: [{ id, current_level?, completed_resources?, add_resources?, notes? }]
+  const response = await api.put('/api/progress/bulk', updates);
+  return response.data;
+};
+
+export const getProgressSummary = async (userId) => {
+  const response = await api.get(`/api/progress/${userId}/summary`);
+  return response.data;
+};
+
 export const deleteProgress = async (progressId) => {
   const response = await api.delete(`/api/progress/${progressId}`);
   return response.data;